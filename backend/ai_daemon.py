@@ -1,24 +1,53 @@
+import signal
 from multiprocessing import Process
 from pprint import pprint
 
 from heuristics import cam_heuristic
-from statespace.search import iterative_deepening_alpha_beta_search
-from statespace.transposition_table_IO import save_transposition_table_to_json, load_transposition_table_from_json, \
-    load_from_pickle, save_to_pickle
+from statespace.move_ordering import MoveOrdering
+from statespace.movecodes import encode_optional_move
+from statespace.search import LAZY_SMP_MODE, iterative_deepening_alpha_beta_search, shutdown_root_split_pool
+from statespace.transposition import free_transposition_table, make_transposition_table
+from statespace.transposition_table_IO import load_from_pickle, save_to_pickle
+
+# memory budget of each colour's transposition table, in MB
+TRANSPOSITION_TABLE_SIZE_MB = 64
+
+# processes searching each move, and how they split the work when there is more than 1
+SEARCH_WORKERS = 1
+SEARCH_PARALLEL_MODE = LAZY_SMP_MODE
 
 
 class AIDaemon(Process):
     def __init__(self, frontend_conn):
         super(AIDaemon, self).__init__()
-        self.daemon = True
+        # daemonic processes can't start the helpers of a parallel search, so then the frontend stops the backend
+        self.daemon = SEARCH_WORKERS == 1
         self.frontend_conn = frontend_conn
-        self._transposition_table_white = load_transposition_table_from_json('transposition_table_white.json')
-        self._transposition_table_black = load_transposition_table_from_json('transposition_table_black.json')
+        # made in run(), so the backend process owns them and frees them when it stops
+        self._transposition_table_white = None
+        self._transposition_table_black = None
+        self._move_ordering_white = MoveOrdering()
+        self._move_ordering_black = MoveOrdering()
         self._first_move_history = load_from_pickle('first_move_history.pkl')
 
     def run(self):
         print("Starting AI Daemon")
         print(f"First move history: {self._first_move_history}")
+        # the frontend stops the backend with terminate(), exit normally instead so the tables are freed
+        signal.signal(signal.SIGTERM, _exit_on_sigterm)
+        # only lazy SMP searches share the tables between processes, root split workers keep tables of their own
+        table_workers = SEARCH_WORKERS if SEARCH_PARALLEL_MODE == LAZY_SMP_MODE else 1
+        self._transposition_table_white = make_transposition_table(TRANSPOSITION_TABLE_SIZE_MB, table_workers)
+        self._transposition_table_black = make_transposition_table(TRANSPOSITION_TABLE_SIZE_MB, table_workers)
+        try:
+            self._serve()
+        finally:
+            shutdown_root_split_pool()
+            free_transposition_table(self._transposition_table_white)
+            free_transposition_table(self._transposition_table_black)
+
+    def _serve(self):
+        """Answers the search requests of the frontend until it stops the backend."""
         while True:
             game_state = self.frontend_conn.recv()
             print('backend received the following request: ')
@@ -30,8 +59,12 @@ class AIDaemon(Process):
                     move, self._transposition_table_black, elapsed_time = iterative_deepening_alpha_beta_search(
                         eval_callback=strategy,
                         transposition_table=self._transposition_table_black,
+                        move_ordering=self._move_ordering_black,
+                        num_workers=SEARCH_WORKERS,
+                        parallel_mode=SEARCH_PARALLEL_MODE,
                         **game_state
                     )
+                    move = encode_optional_move(move)
                     if move not in self._first_move_history:
                         self._first_move_history.add(move)
                         print(f"Updated first move history: {self._first_move_history}")
@@ -43,17 +76,27 @@ class AIDaemon(Process):
                 move, self._transposition_table_black, elapsed_time = iterative_deepening_alpha_beta_search(
                     eval_callback=strategy,
                     transposition_table=self._transposition_table_black,
+                    move_ordering=self._move_ordering_black,
+                    num_workers=SEARCH_WORKERS,
+                    parallel_mode=SEARCH_PARALLEL_MODE,
                     **game_state
                 )
-                self.frontend_conn.send((move, elapsed_time))
+                self.frontend_conn.send((encode_optional_move(move), elapsed_time))
                 # Uncomment line below if you want the t_table to be saved
-                # save_transposition_table_to_json(self._transposition_table_black, 'transposition_table_black.json')
+                # save_to_pickle(self._transposition_table_black, 'transposition_table_black.pkl')
             else:
                 move, self._transposition_table_white, elapsed_time = iterative_deepening_alpha_beta_search(
                     eval_callback=strategy,
                     transposition_table=self._transposition_table_white,
+                    move_ordering=self._move_ordering_white,
+                    num_workers=SEARCH_WORKERS,
+                    parallel_mode=SEARCH_PARALLEL_MODE,
                     **game_state
                 )
-                self.frontend_conn.send((move, elapsed_time))
+                self.frontend_conn.send((encode_optional_move(move), elapsed_time))
                 # Uncomment line below if you want the t_table to be saved
-                # save_transposition_table_to_json(self._transposition_table_white, 'transposition_table_white.json')
+                # save_to_pickle(self._transposition_table_white, 'transposition_table_white.pkl')
+
+
+def _exit_on_sigterm(signum, frame):
+    raise SystemExit(0)
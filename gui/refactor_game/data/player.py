@@ -7,6 +7,7 @@ from gui.refactor_game.config_page import Operator, Color
 from gui.refactor_game.data.log import LogItem
 from heuristics import cam_heuristic
 from statespace.marblecoords import is_out_of_bounds
+from statespace.movecodes import decode_optional_move
 from statespace.search import iterative_deepening_alpha_beta_search
 from statespace.statespace import apply_move
 
@@ -209,8 +210,9 @@ class AIPlayer(Player):
         }
         self.backend_conn.send(request)
 
+        # the backend replies with an encoded move
         move, elapsed_time = self.backend_conn.recv()
-        after_search_callback(move, elapsed_time)
+        after_search_callback(decode_optional_move(move), elapsed_time)
 
     def move_to_action(self, move):
         source_pos, direction = move
@@ -19,4 +19,5 @@ if __name__ == '__main__':
     # game.start_game(config=config)
 
     game.mainloop()
+    backend.terminate()
 
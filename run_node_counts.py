@@ -0,0 +1,67 @@
+"""Compares the nodes each search mode visits on the starting layouts.
+
+Every mode searches each layout to a fixed depth with an empty
+transposition table, so the node counts only differ by how the tree is
+searched. The effective branching factor of a depth is its node count
+over the node count one ply shallower.
+
+usage: python run_node_counts.py [max_depth]
+"""
+import sys
+import time
+
+from heuristics import cam_heuristic
+from search_best_move import starting_boards
+from statespace.external import move_to_out
+from statespace.movecodes import decode_move
+from statespace.search import SearchContext, run_search
+
+# mode name -> the search_options it searches with, see SearchContext
+SEARCH_MODES = {
+    'alpha-beta': {},
+    'pvs': {'pvs': True},
+    'quiescence': {'quiescence': True},
+    'pvs+quiescence': {'pvs': True, 'quiescence': True},
+    'null-move': {'null_move': True},
+    'pvs+null-move': {'pvs': True, 'null_move': True},
+    'lmr': {'lmr': True},
+    'pvs+lmr': {'pvs': True, 'lmr': True},
+}
+
+TOTAL_TURNS_REMAINING = 80
+
+
+def count_search_nodes(board, player, depth, **search_options):
+    """Searches board to depth, returning (best_move, value, search, elapsed).
+
+    search is the SearchContext of the search, with its node counts.
+    """
+    search = SearchContext(board, player, 1.0, cam_heuristic.eval_state, {},
+                           depth, **search_options)
+    start_time = time.perf_counter()
+    best_move, _, value = run_search(search, board.copy(), float('-inf'),
+                                     float('inf'), depth, player,
+                                     TOTAL_TURNS_REMAINING)
+    return best_move, value, search, time.perf_counter() - start_time
+
+
+if __name__ == "__main__":
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+
+    for name, board in starting_boards.items():
+        last_nodes = {}
+        for depth in range(1, max_depth + 1):
+            for mode, search_options in SEARCH_MODES.items():
+                best_move, value, search, elapsed = \
+                    count_search_nodes(board, 0, depth, **search_options)
+                nodes = search.nodes
+                branching_factor = nodes / last_nodes.get(mode, 1)
+                last_nodes[mode] = nodes
+                print(f"{name:<15} depth {depth} {mode:<16} "
+                      f"{nodes:>10} nodes {elapsed * 1000:>10.2f}ms "
+                      f"ebf {branching_factor:>6.2f} "
+                      f"value {value:>10.4f} "
+                      f"{move_to_out(decode_move(best_move)).strip()}")
+                if search.lmr:
+                    print(f"{'':<15} late moves reduced {search.lmr_reductions}"
+                          f", re-searched {search.lmr_re_searches}")
@@ -0,0 +1,22 @@
+"""Runs perft over the starting layouts and validates move generation.
+
+usage: python run_perft.py [max_depth]
+"""
+import os.path
+import sys
+
+from search_best_move import starting_boards
+from statespace.perft import report_perft, validate_reference_boards
+
+if __name__ == "__main__":
+    max_depth = int(sys.argv[1]) if len(sys.argv) > 1 else 3
+
+    print("Validating depth 1 against reference boards...")
+    all_match = validate_reference_boards(
+        os.path.join(os.path.abspath(os.path.curdir),
+                     "tests/statespace_gen_validation"))
+
+    print(f"\nPerft to depth {max_depth}...")
+    report_perft(starting_boards, max_depth)
+
+    sys.exit(0 if all_match else 1)
@@ -1,6 +1,6 @@
 """Currently a testing file for the best-move search algorithm."""
 from heuristics import cam_heuristic
-from statespace.search import game_over, alpha_beta_search_transposition
+from statespace.search import game_over
 from statespace.search import \
     iterative_deepening_alpha_beta_search as id_abs
 from statespace.statespace import apply_move
@@ -1,4 +1,5 @@
 from heuristics import cam_heuristic
+from statespace.move_ordering import MoveOrdering
 from statespace.search import game_over, num_player_marbles, \
     iterative_deepening_alpha_beta_search
 from statespace.statespace import apply_move
@@ -78,7 +79,8 @@ def simulate_game(board,
                   transposition_table,
                   total_turns_remaining_per_player=20,
                   time_limit=5000,
-                  player_color=0):
+                  player_color=0,
+                  num_workers=1):
     """
       Simulates an Abalone game given the starting conditions.
 
@@ -87,11 +89,14 @@ def simulate_game(board,
       - total_turns_remaining_per_player: The total number of turns each player starts with.
       - time_limit: The time limit for each move in milliseconds.
       - player_color: The color of the player who starts the game (0 for Black, 1 for White).
+      - num_workers: The number of processes searching each move. More than 1 runs a lazy SMP search.
       """
     board = board
     black_player_turns_remaining = total_turns_remaining_per_player
     white_player_turns_remaining = total_turns_remaining_per_player
     player = player_color
+    # each player's searches learn their own killer moves and history
+    move_orderings = [MoveOrdering(), MoveOrdering()]
 
     while not game_over(
             board,
@@ -114,6 +119,8 @@ def simulate_game(board,
             turns_remaining,
             cam_heuristic.eval_state,
             transposition_table,
+            num_workers=num_workers,
+            move_ordering=move_orderings[player],
         )
         print(f"Selected Move: {move}\n")
         apply_move(board, move)
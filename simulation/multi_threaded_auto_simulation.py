@@ -6,6 +6,7 @@ import copy
 import os
 
 from simulation.auto_simulation import generate_writable_excel_path
+from statespace.move_ordering import MoveOrdering
 from statespace.search import iterative_deepening_alpha_beta_search as idab
 from statespace.statespace import apply_move
 from statespace.search import game_over
@@ -38,6 +39,8 @@ starting_boards = {
 
 turn_limits = [30]
 time_limits = [5000]
+# processes searching each move, more than 1 runs a lazy SMP search
+num_workers = 1
 
 def generate_writable_excel_path(base_path):
     index = 1  # Start with an index for file naming
@@ -58,7 +61,8 @@ def generate_writable_excel_path(base_path):
     return base_path
 
 
-def simulate_game(board_config_key, turn_limit, time_limit, evaluation_black, evaluation_white, results_queue):
+def simulate_game(board_config_key, turn_limit, time_limit, evaluation_black, evaluation_white, results_queue,
+                  num_workers=1):
     try:
         layout = {0: "standard", 1: "belgian daisy", 2: "german daisy"}.get(board_config_key, "")
         print(f"Simulating...")
@@ -84,12 +88,14 @@ def simulate_game(board_config_key, turn_limit, time_limit, evaluation_black, ev
             transposition_tables[1] = load_transposition_table_from_pickle(transposition_table_file_names[1])
         except FileNotFoundError:
             transposition_tables[1] = {}
+        # each player's searches learn their own killer moves and history
+        move_orderings = [MoveOrdering(), MoveOrdering()]
 
         # Simulation loop
         while not game_over(board_state, turns_remaining[player_turn], player_turn):
             player_turn = 1 - player_turn
             if first_turn:
-                first_move = idab(board_state,
+                first_move, transposition_tables[player_turn], _ = idab(board_state,
                                                                      player_turn,
                                                                      time_limit,
                                                                      turns_remaining[player_turn],
@@ -98,21 +104,25 @@ def simulate_game(board_config_key, turn_limit, time_limit, evaluation_black, ev
                                                                      eval_callback=strategy[player_turn],
                                                                      is_first_move=first_turn,
                                                                      t_table_filename=
-                                                                     transposition_table_file_names[player_turn])
+                                                                     transposition_table_file_names[player_turn],
+                                                                     num_workers=num_workers,
+                                                                     move_ordering=move_orderings[player_turn])
                 apply_move(board_state, first_move)
                 first_turn = False
                 continue
 
-            move, transposition_tables[player_turn] = idab(board_state,
-                                                           player_turn,
-                                                           time_limit,
-                                                           turns_remaining[player_turn],
-                                                           transposition_table=transposition_tables[
-                                                               player_turn],
-                                                           eval_callback=strategy[player_turn],
-                                                           is_first_move=first_turn,
-                                                           t_table_filename=
-                                                           transposition_table_file_names[player_turn])
+            move, transposition_tables[player_turn], _ = idab(board_state,
+                                                              player_turn,
+                                                              time_limit,
+                                                              turns_remaining[player_turn],
+                                                              transposition_table=transposition_tables[
+                                                                  player_turn],
+                                                              eval_callback=strategy[player_turn],
+                                                              is_first_move=first_turn,
+                                                              t_table_filename=
+                                                              transposition_table_file_names[player_turn],
+                                                              num_workers=num_workers,
+                                                              move_ordering=move_orderings[player_turn])
             if move is None:
                 break
             apply_move(board_state, move)
@@ -167,7 +177,7 @@ for board_config_key in [0, 1, 2]:
                         print(f"Starting Thread {thread_num}")
                         thread = Thread(target=simulate_game, args=(
                             board_config_key, turn_limit, time_limit, evaluation_black, evaluation_white, results_queue,
-                            thread_num))
+                            num_workers))
                         thread_num += 1
                         threads.append(thread)
                         thread.start()
@@ -3,6 +3,7 @@ import time
 
 # from statespace.transposition_table_IO import load_transposition_table_from_pickle
 from .base_simulation import Simulation
+from statespace.move_ordering import MoveOrdering
 from statespace.search import iterative_deepening_alpha_beta_search as idab
 from statespace.statespace import apply_move
 from statespace.search import game_over
@@ -15,8 +16,10 @@ strategy = {0: justin_heuristic.eval_state, 1: cam_heuristic.eval_state}
 class VersusSimulation(Simulation):
     """Runs a full versus simulation using 2 sets of heuristics."""
 
-    def __init__(self, board_config_key=0):
+    def __init__(self, board_config_key=0, num_workers=1):
         super().__init__()
+        # processes searching each move, more than 1 runs a lazy SMP search
+        self.num_workers = num_workers
 
         self.starting_boards = {
             # default
@@ -49,7 +52,8 @@ class VersusSimulation(Simulation):
         self.update_display()
         is_first_move = True
         transposition_tables = [{}, {}]
-        paths = {0: [], 1: []}
+        # each player's searches learn their own killer moves and history
+        move_orderings = [MoveOrdering(), MoveOrdering()]
 
 
         while not game_over(self.board_state,
@@ -58,7 +62,7 @@ class VersusSimulation(Simulation):
 
             player_turn = 1 - player_turn
             if is_first_move:
-                first_move, paths[player_turn], transposition_tables[player_turn], _, = idab(self.board_state,
+                first_move, transposition_tables[player_turn], _ = idab(self.board_state,
                                   player_turn,
                                   time_limit,
                                   turns_remaining[player_turn],
@@ -66,20 +70,22 @@ class VersusSimulation(Simulation):
                                       player_turn],
                                   eval_callback=strategy[player_turn],
                                   is_first_move=is_first_move,
-                                  path=paths[player_turn])
+                                  num_workers=self.num_workers,
+                                  move_ordering=move_orderings[player_turn])
                 apply_move(self.board_state, first_move)
                 is_first_move = False
                 continue
 
-            move, paths[player_turn], transposition_tables[player_turn], _, = idab(self.board_state,
-                                                                                   player_turn,
-                                                                                   time_limit,
-                                                                                   turns_remaining[player_turn],
-                                                                                   transposition_table=transposition_tables[
-                                                                                       player_turn],
-                                                                                   eval_callback=strategy[player_turn],
-                                                                                   is_first_move=is_first_move,
-                                                                                   path=paths[player_turn][1:])
+            move, transposition_tables[player_turn], _ = idab(self.board_state,
+                                                              player_turn,
+                                                              time_limit,
+                                                              turns_remaining[player_turn],
+                                                              transposition_table=transposition_tables[
+                                                                  player_turn],
+                                                              eval_callback=strategy[player_turn],
+                                                              is_first_move=is_first_move,
+                                                              num_workers=self.num_workers,
+                                                              move_ordering=move_orderings[player_turn])
 
             if move is None:
                 break
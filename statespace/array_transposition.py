@@ -0,0 +1,148 @@
+"""This module contains a transposition table stored in one NumPy array.
+
+A dict or list entry costs a tuple, a float and a few ints, well over a
+hundred bytes. Here every slot is one fixed 24 byte record of a
+preallocated structured array, so the same memory holds several times the
+positions, and the whole table saves and loads as a single buffer.
+
+Informal Definition, and Conventions:
+
+    RECORD:
+        one slot of the table, with these fields:
+
+            key         uint64   the full hash, checked on every probe
+            value       float64  the entry's value
+            move        uint32   the entry's encoded move, or NO_MOVE
+            depth       int8     the entry's depth, or EMPTY_DEPTH if unused
+            bound       uint8    EXACT_BOUND, LOWER_BOUND or UPPER_BOUND
+            generation  uint8    the generation it was stored in
+            (1 byte of padding)
+
+        records are read and written as the entry tuples described in
+        transposition.py, so this table is a drop-in for a dict or a
+        TranspositionTable.
+
+    BUCKETS:
+        same two slot buckets and replacement policy as TranspositionTable.
+"""
+import numpy as np
+
+from .movecodes import NO_MOVE
+from .transposition import DEFAULT_TT_SIZE_MB, ENTRY_DEPTH, ENTRY_KEY
+
+RECORD_DTYPE = np.dtype([('key', np.uint64),
+                         ('value', np.float64),
+                         ('move', np.uint32),
+                         ('depth', np.int8),
+                         ('bound', np.uint8),
+                         ('generation', np.uint8),
+                         ('padding', np.uint8)])
+
+EMPTY_DEPTH = -1
+
+
+class ArrayTranspositionTable:
+    """
+    A transposition table of fixed size records in a NumPy structured array.
+
+    Each field of the array is also kept as its own view, so a probe reads
+    a few scalars instead of building a record.
+    """
+
+    def __init__(self, size_mb=DEFAULT_TT_SIZE_MB, records=None):
+        if records is None:
+            num_buckets = 1
+            while num_buckets * 4 * RECORD_DTYPE.itemsize \
+                    <= size_mb * 1024 * 1024:
+                num_buckets *= 2
+            records = np.zeros(num_buckets * 2, dtype=RECORD_DTYPE)
+            records['depth'] = EMPTY_DEPTH
+
+        self.records = records
+        self.mask = len(records) // 2 - 1
+        self.generation = 0
+        self._set_views()
+        self.num_entries = int(np.count_nonzero(self.depths != EMPTY_DEPTH))
+
+    def _set_views(self):
+        self.keys = self.records['key']
+        self.values = self.records['value']
+        self.moves = self.records['move']
+        self.depths = self.records['depth']
+        self.bounds = self.records['bound']
+        self.generations = self.records['generation']
+
+    def __getstate__(self):
+        return {'records': self.records, 'generation': self.generation}
+
+    def __setstate__(self, state):
+        self.__init__(records=state['records'])
+        self.generation = state['generation']
+
+    def __len__(self):
+        return self.num_entries
+
+    def _entry(self, index):
+        move = int(self.moves[index])
+        return (int(self.keys[index]), int(self.depths[index]),
+                float(self.values[index]), int(self.bounds[index]),
+                move if move != NO_MOVE else None)
+
+    def _holds(self, index, key):
+        return self.depths[index] != EMPTY_DEPTH \
+            and int(self.keys[index]) == key
+
+    def get(self, key, default=None):
+        """Gets the entry stored for key, or default."""
+        index = (key & self.mask) << 1
+        if self._holds(index, key):
+            return self._entry(index)
+        if self._holds(index + 1, key):
+            return self._entry(index + 1)
+        return default
+
+    def __setitem__(self, key, entry):
+        """Stores entry for key, evicting by the replacement policy."""
+        index = (key & self.mask) << 1
+
+        if self.depths[index] == EMPTY_DEPTH:
+            self.num_entries += 1
+        elif int(self.keys[index]) != key \
+                and self.generations[index] == self.generation \
+                and self.depths[index] > entry[ENTRY_DEPTH]:
+            index += 1
+            if self.depths[index] == EMPTY_DEPTH:
+                self.num_entries += 1
+        elif self._holds(index + 1, key):
+            # the same key must not be left behind in the second slot
+            self.depths[index + 1] = EMPTY_DEPTH
+            self.num_entries -= 1
+
+        _, depth, value, bound, move = entry
+        self.keys[index] = entry[ENTRY_KEY]
+        self.values[index] = value
+        self.moves[index] = move if move is not None else NO_MOVE
+        self.depths[index] = depth
+        self.bounds[index] = bound
+        self.generations[index] = self.generation
+
+    def new_search(self):
+        """Starts a new generation, making every entry stored so far stale."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        """Removes every entry."""
+        self.records[:] = 0
+        self.depths[:] = EMPTY_DEPTH
+        self.num_entries = 0
+
+    def save(self, filename):
+        """Saves every record to filename as one .npy buffer."""
+        np.save(filename, self.records)
+
+    @classmethod
+    def load(cls, filename):
+        """Loads a table saved by save. Its entries all start out stale."""
+        table = cls(records=np.load(filename))
+        table.generation = (int(table.generations.max(initial=0)) + 1) & 0xFF
+        return table
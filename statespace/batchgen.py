@@ -0,0 +1,263 @@
+"""This module contains a batched NumPy version of move generation.
+
+Drivers that generate data or play rollouts want the moves of thousands of
+boards at once, not one board at a time. Every legal move on the board has
+one of a few thousand fixed shapes (which cells must hold the player, the
+enemy, or nothing), so each shape is checked against a whole batch of
+boards with a single array comparison.
+
+Informal Definition, and Conventions:
+
+    OCCUPANCY ARRAY:
+        an int8 array of shape (N, 61), one row per board. Column i holds
+        the colour of the marble on BATCH_COORDS[i], or EMPTY.
+
+        example:
+            {35:0, 36:0, 37:1}
+            ->
+            row with row[CELL_INDEX[35]] = 0, row[CELL_INDEX[36]] = 0,
+            row[CELL_INDEX[37]] = 1 and EMPTY everywhere else
+
+    CELL INDEX:
+        the column of a coord in an occupancy array. The extra cell
+        OFF_BOARD_CELL stands for every coord off the board, so the move
+        shape arrays below can be padded without a bounds check.
+
+    MOVE SHAPE:
+        one row of SHAPE_CELLS and SHAPE_STATES, up to MAX_SHAPE_CELLS cells
+        together with the state each must be in: PLAYER, ENEMY, VACANT or
+        ANY (padding). A move is legal on a board exactly when its shape
+        matches. SHAPE_WRITES and SHAPE_WRITE_STATES list the cells the move
+        changes and the states they end up in.
+
+    MOVES:
+        moves come out as encoded moves, like movecodes.py, so they can be
+        decoded into groupmoves or fed straight to the search.
+"""
+import numpy as np
+
+from .bitboard import INLINE_KINDS
+from .movecodes import (INLINE_MOVE, PUSH_MOVE, PUSH_OFF_MOVE, SIDESTEP_MOVE,
+                        MOVE_COLOR_SHIFT, pack_move)
+from .statespace import NEIGHBOURS, RAYS, VALID_COORDS, absolute_directions
+
+EMPTY = -1
+
+BATCH_COORDS = sorted(VALID_COORDS)
+
+CELL_INDEX = {coord: index for index, coord in enumerate(BATCH_COORDS)}
+
+OFF_BOARD_CELL = len(BATCH_COORDS)
+
+# states of a cell relative to the player to move
+PLAYER = 0
+ENEMY = 1
+VACANT = 2
+ANY = 3
+
+MAX_SHAPE_CELLS = 6
+
+MAX_SHAPE_WRITES = 6
+
+
+def _cell(coord: int | None) -> int:
+    """Cell index of coord, or OFF_BOARD_CELL for None and off-board coords."""
+    return CELL_INDEX.get(coord, OFF_BOARD_CELL)
+
+
+def _inline_shapes(tail: int, direction: int):
+    """Yields (move, cells, states, writes, write_states) for inline moves.
+
+    The group runs from tail in direction, players first then enemies, and
+    every cell after the first moves one step on.
+    """
+    ray = RAYS[tail][direction]
+    for num_players, num_enemies in INLINE_KINDS:
+        length = num_players + num_enemies
+        if len(ray) < length - 1:
+            continue
+        coords = (tail,) + ray[:length - 1]
+        beyond = ray[length - 1] if len(ray) >= length else None
+
+        if beyond is None and not num_enemies:
+            continue
+        if not num_enemies:
+            kind = INLINE_MOVE
+        elif beyond is None:
+            kind = PUSH_OFF_MOVE
+        else:
+            kind = PUSH_MOVE
+
+        states = [PLAYER] * num_players + [ENEMY] * num_enemies
+        cells = [CELL_INDEX[coord] for coord in coords]
+        if beyond is not None:
+            cells.append(CELL_INDEX[beyond])
+            states.append(VACANT)
+
+        # the tail empties, the players take num_players cells from the
+        # second on, and the enemies the cells after them
+        write_states = [VACANT] + [PLAYER] * num_players \
+            + [ENEMY] * num_enemies
+        writes = cells[:1] + [_cell(coord) for coord
+                              in coords[1:] + (beyond,)]
+        yield (pack_move(tail, direction, length, kind, 0),
+               cells, states, writes, write_states)
+
+
+def _sidestep_shapes(tail: int, axis: int):
+    """Yields (move, cells, states, writes, write_states) for sidesteps.
+
+    The group is laid out along axis from tail, like sidestep groupdirs.
+    """
+    for group_size in (2, 3):
+        members = (tail,) + RAYS[tail][axis][:group_size - 1]
+        if len(members) < group_size:
+            continue
+
+        for direction in absolute_directions:
+            if direction == axis:
+                continue
+            for side in (direction, -direction):
+                targets = [NEIGHBOURS[member][side] for member in members]
+                if None in targets:
+                    continue
+                cells = [CELL_INDEX[coord] for coord in members + tuple(targets)]
+                states = [PLAYER] * group_size + [VACANT] * group_size
+                yield (pack_move(tail, side, group_size, SIDESTEP_MOVE, 0,
+                                 axis),
+                       cells, states, cells,
+                       [VACANT] * group_size + [PLAYER] * group_size)
+
+
+def _build_shapes():
+    """Builds the move shape arrays, in the order moves are returned."""
+    shapes = []
+    for coord in BATCH_COORDS:
+        for direction in absolute_directions:
+            shapes.extend(_inline_shapes(coord, direction))
+            shapes.extend(_inline_shapes(coord, -direction))
+            shapes.extend(_sidestep_shapes(coord, direction))
+
+    num_shapes = len(shapes)
+    moves = np.zeros(num_shapes, dtype=np.int64)
+    cells = np.full((num_shapes, MAX_SHAPE_CELLS), OFF_BOARD_CELL,
+                    dtype=np.intp)
+    states = np.full((num_shapes, MAX_SHAPE_CELLS), ANY, dtype=np.int8)
+    writes = np.full((num_shapes, MAX_SHAPE_WRITES), OFF_BOARD_CELL,
+                     dtype=np.intp)
+    write_states = np.full((num_shapes, MAX_SHAPE_WRITES), VACANT,
+                           dtype=np.int8)
+
+    for index, (move, shape_cells, shape_states, shape_writes,
+                shape_write_states) in enumerate(shapes):
+        moves[index] = move
+        cells[index, :len(shape_cells)] = shape_cells
+        states[index, :len(shape_states)] = shape_states
+        writes[index, :len(shape_writes)] = shape_writes
+        write_states[index, :len(shape_write_states)] = shape_write_states
+
+    return moves, cells, states, writes, write_states
+
+
+(SHAPE_MOVES, SHAPE_CELLS, SHAPE_STATES,
+ SHAPE_WRITES, SHAPE_WRITE_STATES) = _build_shapes()
+
+
+def boards_to_array(boards: list[dict[int, int]]) -> np.ndarray:
+    """Converts a list of board dictionaries into an occupancy array."""
+    occupancy = np.full((len(boards), OFF_BOARD_CELL), EMPTY, dtype=np.int8)
+    for row, board in enumerate(boards):
+        for coord, color in board.items():
+            occupancy[row, CELL_INDEX[coord]] = color
+    return occupancy
+
+
+def array_to_board(occupancy_row: np.ndarray) -> dict[int, int]:
+    """Converts one row of an occupancy array into a board dictionary."""
+    return {BATCH_COORDS[cell]: int(occupancy_row[cell])
+            for cell in np.flatnonzero(occupancy_row != EMPTY)}
+
+
+def relative_states(occupancy: np.ndarray,
+                    player_colors: np.ndarray) -> np.ndarray:
+    """PLAYER, ENEMY or VACANT for every cell, plus ANY for OFF_BOARD_CELL.
+
+    return format explained:
+        output = int8 array of shape (N, 62)
+    """
+    colors = player_colors[:, None]
+    states = np.where(occupancy == EMPTY, VACANT,
+                      np.where(occupancy == colors, PLAYER, ENEMY))
+    return np.concatenate(
+        [states.astype(np.int8),
+         np.full((len(occupancy), 1), ANY, dtype=np.int8)], axis=1)
+
+
+def legal_shape_mask(occupancy: np.ndarray, player_colors) -> np.ndarray:
+    """Which move shapes are legal on which boards.
+
+    return format explained:
+        output = bool array of shape (N, num_shapes)
+    """
+    player_colors = np.broadcast_to(np.asarray(player_colors, dtype=np.int8),
+                                    (len(occupancy),))
+    states = relative_states(occupancy, player_colors)
+    legal = np.ones((len(occupancy), len(SHAPE_MOVES)), dtype=bool)
+    for slot in range(MAX_SHAPE_CELLS):
+        slot_states = SHAPE_STATES[:, slot]
+        legal &= (states[:, SHAPE_CELLS[:, slot]] == slot_states) \
+            | (slot_states == ANY)
+    return legal
+
+
+def genall_moves_batch(occupancy: np.ndarray, player_colors) \
+        -> tuple[np.ndarray, np.ndarray]:
+    """Generates every legal move on every board of a batch.
+
+    player_colors is the colour to move, for all boards or one per board.
+    Moves of the same board are contiguous, ordered by the coord of their
+    tail.
+
+    return format explained:
+        output = (board_indices, encoded_moves)
+    """
+    player_colors = np.broadcast_to(np.asarray(player_colors, dtype=np.int8),
+                                    (len(occupancy),))
+    board_indices, shape_indices = np.nonzero(
+        legal_shape_mask(occupancy, player_colors))
+    moves = SHAPE_MOVES[shape_indices] \
+        | player_colors[board_indices].astype(np.int64) << MOVE_COLOR_SHIFT
+    return board_indices, moves
+
+
+def genall_moves_resultboards_batch(occupancy: np.ndarray, player_colors) \
+        -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Generates every legal move on every board of a batch, with children.
+
+    return format explained:
+        output = (board_indices, encoded_moves, resultant_occupancy)
+
+        resultant_occupancy[i] is the board board_indices[i] after
+        encoded_moves[i].
+    """
+    player_colors = np.broadcast_to(np.asarray(player_colors, dtype=np.int8),
+                                    (len(occupancy),))
+    board_indices, shape_indices = np.nonzero(
+        legal_shape_mask(occupancy, player_colors))
+    colors = player_colors[board_indices]
+    moves = SHAPE_MOVES[shape_indices] \
+        | colors.astype(np.int64) << MOVE_COLOR_SHIFT
+
+    # an extra column soaks up writes to OFF_BOARD_CELL, like marbles
+    # pushed off the board
+    children = np.concatenate(
+        [occupancy[board_indices],
+         np.full((len(board_indices), 1), EMPTY, dtype=np.int8)], axis=1)
+    write_states = SHAPE_WRITE_STATES[shape_indices]
+    colors = colors[:, None]
+    written = np.where(write_states == PLAYER, colors,
+                       np.where(write_states == ENEMY, 1 - colors, EMPTY))
+    children[np.arange(len(board_indices))[:, None],
+             SHAPE_WRITES[shape_indices]] = written
+
+    return board_indices, moves, children[:, :OFF_BOARD_CELL]
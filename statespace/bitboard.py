@@ -0,0 +1,304 @@
+"""This module contains a bitboard version of the state space functions.
+
+The functions here mirror the ones in statespace.py, but work on a pair of
+integer masks instead of a dictionary. Integers are immutable, so generating
+a child board is a couple of bit operations instead of a dict copy.
+
+Informal Definition, and Conventions:
+
+    BITBOARD FORMAT:
+        a tuple of two integer masks, one per colour:
+            (<black_mask>, <white_mask>)
+
+        bit n of a mask is set when that colour has a marble on coord n,
+        where coord is the same int used by the board dictionary format.
+        Only the 61 bits in VALID_MASK are ever set.
+
+        example:
+            {35:0, 36:0, 37:1}
+            ->
+            ((1 << 35) | (1 << 36), (1 << 37))
+
+    SHIFTING:
+        since a coord is <row_digit><column_digit>, moving a whole mask one
+        step in a direction is a shift by that direction's delta. Column 0
+        and rows 0 and 10 are never valid, so anything that walks off the
+        board lands on an invalid bit and is masked away by VALID_MASK.
+        Shifts are only exact one step at a time, so multistep shifts are
+        always done as repeated single steps.
+
+    GROUPMOVES:
+        groupmoves are generated in the same format as statespace.py, so
+        moves from either representation can be applied to either.
+"""
+from .statespace import VALID_COORDS, absolute_directions, all_directions
+from .zobrist import hashed_positions
+
+VALID_MASK = sum(1 << coord for coord in VALID_COORDS)
+
+ZOBRIST_BY_COLOR = [{coord: hashed_positions[(coord, color)]
+                     for coord in VALID_COORDS}
+                    for color in (0, 1)]
+
+
+def board_to_bitboard(board: dict[int, int]) -> tuple[int, int]:
+    """Converts a board dictionary into a bitboard."""
+    masks = [0, 0]
+    for coord, color in board.items():
+        masks[color] |= 1 << coord
+    return masks[0], masks[1]
+
+
+def bitboard_to_board(bitboard: tuple[int, int]) -> dict[int, int]:
+    """Converts a bitboard into a board dictionary."""
+    board = {}
+    for color in (0, 1):
+        for coord in iter_coords(bitboard[color]):
+            board[coord] = color
+    return board
+
+
+def iter_coords(mask: int):
+    """Yields the coord of every set bit in mask, lowest first."""
+    while mask:
+        low_bit = mask & -mask
+        yield low_bit.bit_length() - 1
+        mask ^= low_bit
+
+
+def shift(mask: int, delta: int) -> int:
+    """Moves every marble in mask one step by delta, dropping invalid bits."""
+    if delta > 0:
+        return (mask << delta) & VALID_MASK
+    return (mask >> -delta) & VALID_MASK
+
+
+def ahead(mask: int, delta: int, steps: int) -> int:
+    """Mask of coords whose cell `steps` away in direction delta is in mask."""
+    for _ in range(steps):
+        mask = shift(mask, -delta)
+    return mask
+
+
+# OFF_BOARD_AHEAD[delta][steps] is the mask of valid coords whose cell
+# `steps` away in direction delta falls off the board
+OFF_BOARD_AHEAD = {delta: [VALID_MASK & ~ahead(VALID_MASK, delta, steps)
+                           for steps in range(6)]
+                   for delta in all_directions}
+
+
+def move_toggles(groupmove: tuple[tuple[tuple[int, int], ...], int]) \
+        -> tuple[int, int]:
+    """Masks that turn a board into its child when XORed onto it.
+
+    Every marble in the group toggles off its coord and toggles on its
+    destination, so the child is (black ^ toggles[0], white ^ toggles[1]).
+    """
+    toggles = [0, 0]
+    delta = groupmove[1]
+    for coord, color in groupmove[0]:
+        toggles[color] ^= 1 << coord
+        if coord + delta in VALID_COORDS:
+            toggles[color] ^= 1 << (coord + delta)
+    return toggles[0], toggles[1]
+
+
+def _build_inline_table():
+    """Maps (color, delta, num_players, num_enemies) to {tail: entry}.
+
+    entry = (groupmove, toggles) for the inline move with that tail. Only
+    groups whose marbles all sit on the board are included.
+    """
+    table = {}
+    for color in (0, 1):
+        for delta in all_directions:
+            for num_players, num_enemies in INLINE_KINDS:
+                entries = {}
+                for tail in VALID_COORDS:
+                    coords = [tail + delta * i
+                              for i in range(num_players + num_enemies)]
+                    if any(coord not in VALID_COORDS for coord in coords):
+                        continue
+                    group = tuple((coord, color if i < num_players
+                                   else 1 - color)
+                                  for i, coord in enumerate(coords))
+                    groupmove = (group, delta)
+                    entries[tail] = (groupmove, move_toggles(groupmove))
+                table[(color, delta, num_players, num_enemies)] = entries
+    return table
+
+
+def _build_sidestep_table():
+    """Maps (color, axis, delta, num_players) to {tail: entry}.
+
+    entry = (groupmove, toggles) for the sidestep of the group laid out
+    along axis from tail.
+    """
+    table = {}
+    for color in (0, 1):
+        for axis in absolute_directions:
+            for delta in all_directions:
+                if delta == axis or delta == -axis:
+                    continue
+                for num_players in (2, 3):
+                    entries = {}
+                    for tail in VALID_COORDS:
+                        coords = [tail + axis * i for i in range(num_players)]
+                        if any(coord not in VALID_COORDS for coord in coords):
+                            continue
+                        groupmove = (tuple((coord, color) for coord in coords),
+                                     delta)
+                        entries[tail] = (groupmove, move_toggles(groupmove))
+                    table[(color, axis, delta, num_players)] = entries
+    return table
+
+
+# (num_players, num_enemies) of every kind of inline move
+INLINE_KINDS = [(1, 0), (2, 0), (3, 0), (2, 1), (3, 1), (3, 2)]
+
+INLINE_TABLE = _build_inline_table()
+
+SIDESTEP_TABLE = _build_sidestep_table()
+
+
+def genall_groupmove_resultboard_bitboard(bitboard: tuple[int, int],
+                                          player_color: int) \
+        -> list[tuple[tuple[tuple[tuple[int, int], ...], int],
+                      tuple[int, int]]]:
+    """Generates all groupmoves and the resulting bitboard from those moves.
+
+    return format explained:
+        output = list[(groupmove, resultant_bitboard)]
+    """
+    black, white = bitboard
+    return [(groupmove, (black ^ toggles[0], white ^ toggles[1]))
+            for groupmove, toggles
+            in derive_inline_entries(bitboard, player_color)
+            + derive_sidestep_entries(bitboard, player_color)]
+
+
+def genall_groupmoves_bitboard(bitboard: tuple[int, int],
+                               player_color: int) \
+        -> tuple[list[tuple[tuple[tuple[int, int], ...], int]],
+        list[tuple[tuple[tuple[int, int], ...], int]]]:
+    """Generates all groupmoves for player_color on a bitboard.
+
+    return format explained:
+        output = (list[inline_groupmove], list[sidestep_groupmove])
+    """
+    return ([entry[0] for entry
+             in derive_inline_entries(bitboard, player_color)],
+            [entry[0] for entry
+             in derive_sidestep_entries(bitboard, player_color)])
+
+
+def derive_inline_entries(bitboard: tuple[int, int],
+                          player_color: int) \
+        -> list[tuple[tuple[tuple[tuple[int, int], ...], int],
+                      tuple[int, int]]]:
+    """Gets (groupmove, toggles) for every inline move, sumitos included.
+
+    Every legal move of a kind is found for all marbles at once with mask
+    operations, keyed by the coord of the group's tail, the marble furthest
+    from the direction of travel.
+    """
+    players = bitboard[player_color]
+    enemies = bitboard[1 - player_color]
+    empties = VALID_MASK & ~(players | enemies)
+
+    entries = []
+    for delta in all_directions:
+        off_board = OFF_BOARD_AHEAD[delta]
+        players_1 = shift(players, -delta)
+        players_2 = shift(players_1, -delta)
+        enemies_2 = ahead(enemies, delta, 2)
+        enemies_3 = shift(enemies_2, -delta)
+        enemies_4 = shift(enemies_3, -delta)
+        empties_1 = shift(empties, -delta)
+        empties_2 = shift(empties_1, -delta)
+        empties_3 = shift(empties_2, -delta)
+        empties_4 = shift(empties_3, -delta)
+        empties_5 = shift(empties_4, -delta)
+
+        tails_2 = players & players_1
+        tails_3 = tails_2 & players_2
+
+        kinds = (
+            ((1, 0), players & empties_1),
+            ((2, 0), tails_2 & empties_2),
+            ((3, 0), tails_3 & empties_3),
+            ((2, 1), tails_2 & enemies_2 & (empties_3 | off_board[3])),
+            ((3, 1), tails_3 & enemies_3 & (empties_4 | off_board[4])),
+            ((3, 2), tails_3 & enemies_3 & enemies_4
+             & (empties_5 | off_board[5])),
+        )
+
+        for (num_players, num_enemies), tails in kinds:
+            if tails:
+                table = INLINE_TABLE[(player_color, delta,
+                                      num_players, num_enemies)]
+                entries.extend([table[tail] for tail in iter_coords(tails)])
+
+    return entries
+
+
+def derive_sidestep_entries(bitboard: tuple[int, int],
+                            player_color: int) \
+        -> list[tuple[tuple[tuple[tuple[int, int], ...], int],
+                      tuple[int, int]]]:
+    """Gets (groupmove, toggles) for every sidestep of 2 and 3 marbles.
+
+    Groups are laid out along one of the absolute_directions starting from
+    their tail, like the sidestep groupdirs in statespace.py.
+    """
+    players = bitboard[player_color]
+    empties = VALID_MASK & ~(players | bitboard[1 - player_color])
+
+    entries = []
+    for axis in absolute_directions:
+        tails_2 = players & shift(players, -axis)
+        tails_3 = tails_2 & ahead(players, axis, 2)
+        if not tails_2:
+            continue
+
+        for delta in all_directions:
+            if delta == axis or delta == -axis:
+                continue
+
+            free_1 = shift(empties, -delta)
+            free_2 = free_1 & shift(free_1, -axis)
+            free_3 = free_2 & ahead(free_1, axis, 2)
+
+            for num_players, tails in ((2, tails_2 & free_2),
+                                       (3, tails_3 & free_3)):
+                if tails:
+                    table = SIDESTEP_TABLE[(player_color, axis,
+                                            delta, num_players)]
+                    entries.extend([table[tail]
+                                    for tail in iter_coords(tails)])
+
+    return entries
+
+
+def apply_move_bitboard(bitboard: tuple[int, int],
+                        groupmove: tuple[tuple[tuple[int, int], ...], int]) \
+        -> tuple[int, int]:
+    """Returns the bitboard resulting from applying groupmove to bitboard."""
+    toggles = move_toggles(groupmove)
+    return bitboard[0] ^ toggles[0], bitboard[1] ^ toggles[1]
+
+
+def num_player_marbles_bitboard(player: int,
+                                bitboard: tuple[int, int]) -> int:
+    """Counts the number of marbles belonging to player on a bitboard."""
+    return bitboard[player].bit_count()
+
+
+def hash_board_state_bitboard(bitboard: tuple[int, int]) -> int:
+    """Zobrist hash of a bitboard, equal to hash_board_state of its dict."""
+    hashed_board = 0
+    for color in (0, 1):
+        keys = ZOBRIST_BY_COLOR[color]
+        for coord in iter_coords(bitboard[color]):
+            hashed_board ^= keys[coord]
+    return hashed_board
@@ -0,0 +1,138 @@
+"""This module contains the move ordering heuristics the search learns from its cutoffs.
+
+Moves are generated largest group first, which says nothing about which
+moves actually refuted the enemy elsewhere in the tree. A MoveOrdering
+remembers the moves that caused cutoffs, and puts moves like them first
+wherever they come up again, so later nodes cut off sooner. Every move but
+a push-off is learned from, pushes included, since push-offs are the only
+moves with a place in the order of their own.
+
+Informal Definition, and Conventions:
+
+    KILLER MOVES:
+        the last KILLER_SLOTS different moves that caused a cutoff at a
+        ply, newest first. Positions at the same ply of a search often
+        share a refutation.
+
+    COUNTER MOVES:
+        previous_move -> the last move that caused a cutoff right after
+        it, previous_move being the move that led to the node.
+
+    HISTORY:
+        a score for every (from cell, direction) of each colour. A cutoff
+        adds depth * depth to the score of its move, so cutoffs high in
+        the tree count the most. The from cell of a move is its anchor,
+        so together they are the lowest MOVE_AXIS_SHIFT bits of the
+        encoded move:
+
+            index = colour << MOVE_AXIS_SHIFT | move & HISTORY_MOVE_MASK
+
+    ORDER:
+        push-offs, then killer moves, then the counter move, then
+        everything else by history score. Ties keep the order moves were
+        generated in, largest group first.
+"""
+from .movecodes import (MOVE_AXIS_SHIFT, MOVE_COLOR_SHIFT, MOVE_KIND_SHIFT,
+                        PUSH_OFF_MOVE)
+
+KILLER_SLOTS = 2
+
+HISTORY_MOVE_MASK = (1 << MOVE_AXIS_SHIFT) - 1
+HISTORY_SIZE = 2 << MOVE_AXIS_SHIFT
+
+# once a history score passes this, every score is halved
+HISTORY_LIMIT = 1 << 16
+
+# scores above any history score, so these moves always come first
+COUNTER_MOVE_SCORE = HISTORY_LIMIT + 1
+KILLER_SCORE = COUNTER_MOVE_SCORE + KILLER_SLOTS
+PUSH_OFF_SCORE = KILLER_SCORE + 1
+
+
+def history_index(move: int) -> int:
+    """Index of an encoded move's colour, from cell and direction in the
+    history."""
+    return (move >> MOVE_COLOR_SHIFT & 0x1) << MOVE_AXIS_SHIFT \
+        | move & HISTORY_MOVE_MASK
+
+
+class MoveOrdering:
+    """
+    Killer moves, counter moves and history scores, kept across searches.
+
+    Made for the searches of one player. Keep the same instance for every
+    move of a game, so what earlier searches learned orders later ones.
+    new_search() ages it for the next move.
+    """
+
+    def __init__(self):
+        self.killers = []
+        self.counter_moves = {}
+        self.history = [0] * HISTORY_SIZE
+
+    def order(self, moves, ply: int, previous_move: int | None,
+              first_move: int | None = None) -> list[int]:
+        """Sorts encoded moves, best first, for a node at ply.
+
+        first_move, if not None, goes before everything else, like the
+        principal path or transposition table move.
+        """
+        killers = self.killers[ply] if ply < len(self.killers) else []
+        counter_move = self.counter_moves.get(previous_move)
+        history = self.history
+
+        def score(move):
+            if move >> MOVE_KIND_SHIFT & 0x3 == PUSH_OFF_MOVE:
+                return PUSH_OFF_SCORE
+            if move in killers:
+                return KILLER_SCORE - killers.index(move)
+            if move == counter_move:
+                return COUNTER_MOVE_SCORE
+            return history[history_index(move)]
+
+        ordered = sorted((move for move in moves if move != first_move),
+                         key=score, reverse=True)
+        if first_move is not None:
+            ordered.insert(0, first_move)
+        return ordered
+
+    def record_cutoff(self, move: int, ply: int, depth: int,
+                      previous_move: int | None) -> None:
+        """Learns from a move that caused a cutoff at ply, depth plies
+        above the horizon. Push-offs are skipped, every other move is
+        learned from."""
+        if move >> MOVE_KIND_SHIFT & 0x3 == PUSH_OFF_MOVE:
+            # push-offs are always ordered first anyway
+            return
+
+        while len(self.killers) <= ply:
+            self.killers.append([])
+        killers = self.killers[ply]
+        if move in killers:
+            killers.remove(move)
+        killers.insert(0, move)
+        del killers[KILLER_SLOTS:]
+
+        if previous_move is not None:
+            self.counter_moves[previous_move] = move
+
+        index = history_index(move)
+        self.history[index] += depth * depth
+        if self.history[index] > HISTORY_LIMIT:
+            self.history = [score // 2 for score in self.history]
+
+    def new_search(self):
+        """Ages everything for the search of the player's next move.
+
+        Two plies were played since the last search, so the killer moves
+        of its ply 2 are now the killer moves of ply 0. History scores
+        are halved, so recent cutoffs count the most.
+        """
+        del self.killers[:2]
+        self.history = [score // 2 for score in self.history]
+
+    def clear(self):
+        """Forgets everything."""
+        self.killers = []
+        self.counter_moves = {}
+        self.history = [0] * HISTORY_SIZE
@@ -0,0 +1,356 @@
+"""This module contains the packed integer encoding of groupmoves.
+
+A groupmove tuple like (((33,0), (34,0), (35,1)), 1) costs several tuple
+allocations to build and a deep comparison to match. The search only needs
+to tell moves apart, order them and replay them, so it works on moves
+packed into a single int instead, and decodes them back into groupmoves
+at the edges.
+
+Informal Definition, and Conventions:
+
+    ENCODED MOVE:
+        an int with the following bit fields, lowest bits first:
+
+            bits  0-6   anchor: coord of the group's tail
+            bits  7-9   index of the moving direction in all_directions
+            bits 10-11  index of the group's axis in absolute_directions,
+                        only used by sidesteps
+            bit  12     colour of the moving player
+            bits 13-14  kind: INLINE_MOVE, SIDESTEP_MOVE, PUSH_MOVE or
+                        PUSH_OFF_MOVE
+            bits 15-17  length: number of marbles in the group, pushed
+                        enemy marbles included
+
+        the tail of an inline group is the marble furthest from the
+        direction of travel. The tail of a sidestep group is its first
+        marble along a positive axis, like sidestep groupdirs.
+
+        length and kind sit in the highest bits, so sorting encoded moves
+        in reverse puts the largest groups first, and pushes ahead of
+        quiet moves of the same size.
+
+        example:
+            ( ((33,0), (34,0), (35,1)), 1 )
+            ->
+            33 | 2 << 7 | 0 << 12 | PUSH_MOVE << 13 | 3 << 15
+
+    PUSH LENGTHS:
+        the player always outnumbers the enemies in a sumito, so the
+        length of a push alone tells how many enemies it pushes:
+            3 -> 2 vs 1, 4 -> 3 vs 1, 5 -> 3 vs 2
+"""
+from .statespace import (GENERATED_ORDER, LARGEST_FIRST_ORDER, NEIGHBOURS,
+                         RAYS, VALID_COORDS, absolute_directions,
+                         all_directions)
+
+INLINE_MOVE = 0
+SIDESTEP_MOVE = 1
+PUSH_MOVE = 2
+PUSH_OFF_MOVE = 3
+
+MOVE_ANCHOR_MASK = 0x7F
+MOVE_DIRECTION_SHIFT = 7
+MOVE_AXIS_SHIFT = 10
+MOVE_COLOR_SHIFT = 12
+MOVE_KIND_SHIFT = 13
+MOVE_LENGTH_SHIFT = 15
+
+# number of player marbles in a push of a given length
+PUSH_NUM_PLAYERS = {3: 2, 4: 3, 5: 3}
+
+DIRECTION_INDEX = {direction: index
+                   for index, direction in enumerate(all_directions)}
+
+AXIS_INDEX = {axis: index for index, axis in enumerate(absolute_directions)}
+
+# direction -> its index already shifted into place
+DIRECTION_BITS = {direction: index << MOVE_DIRECTION_SHIFT
+                  for direction, index in DIRECTION_INDEX.items()}
+
+MOVE_LENGTH_BITS = 0x7 << MOVE_LENGTH_SHIFT
+
+# stands for no move where a move field can't hold None, like the arrays of
+# the transposition tables. Coord 0 is off the board, so no real move
+# encodes to 0
+NO_MOVE = 0
+
+# encoded move -> groupmove, filled in as moves are decoded
+_decoded_moves = {}
+
+
+def pack_move(anchor: int, direction: int, length: int, kind: int,
+              color: int, axis: int = absolute_directions[0]) -> int:
+    """Packs the fields of a move into an encoded move."""
+    return (anchor
+            | DIRECTION_INDEX[direction] << MOVE_DIRECTION_SHIFT
+            | AXIS_INDEX[axis] << MOVE_AXIS_SHIFT
+            | color << MOVE_COLOR_SHIFT
+            | kind << MOVE_KIND_SHIFT
+            | length << MOVE_LENGTH_SHIFT)
+
+
+def move_anchor(move: int) -> int:
+    """Coord of the tail of an encoded move's group."""
+    return move & MOVE_ANCHOR_MASK
+
+
+def move_direction(move: int) -> int:
+    """Direction delta an encoded move moves in."""
+    return all_directions[move >> MOVE_DIRECTION_SHIFT & 0x7]
+
+
+def move_kind(move: int) -> int:
+    """INLINE_MOVE, SIDESTEP_MOVE, PUSH_MOVE or PUSH_OFF_MOVE."""
+    return move >> MOVE_KIND_SHIFT & 0x3
+
+
+def move_length(move: int) -> int:
+    """Number of marbles in an encoded move's group, enemies included."""
+    return move >> MOVE_LENGTH_SHIFT
+
+
+def encode_move(groupmove: tuple[tuple[tuple[int, int], ...], int]) -> int:
+    """Packs a groupmove into an encoded move."""
+    group, direction = groupmove
+    color = group[0][1]
+    length = len(group)
+
+    if length == 1 or group[1][0] - group[0][0] == direction:
+        if group[-1][1] == color:
+            kind = INLINE_MOVE
+        elif group[-1][0] + direction in VALID_COORDS:
+            kind = PUSH_MOVE
+        else:
+            kind = PUSH_OFF_MOVE
+        return pack_move(group[0][0], direction, length, kind, color)
+
+    axis = group[1][0] - group[0][0]
+    anchor = group[0][0]
+    if axis < 0:
+        axis = -axis
+        anchor = group[-1][0]
+    return pack_move(anchor, direction, length, SIDESTEP_MOVE, color, axis)
+
+
+def decode_move(move: int) -> tuple[tuple[tuple[int, int], ...], int]:
+    """Unpacks an encoded move into a groupmove.
+
+    Decoded groupmoves are cached, so decoding the same move again is a
+    dict lookup and returns the same tuple.
+    """
+    groupmove = _decoded_moves.get(move)
+    if groupmove is not None:
+        return groupmove
+
+    anchor = move_anchor(move)
+    direction = move_direction(move)
+    kind = move_kind(move)
+    length = move_length(move)
+    color = move >> MOVE_COLOR_SHIFT & 0x1
+
+    if kind == SIDESTEP_MOVE:
+        axis = absolute_directions[move >> MOVE_AXIS_SHIFT & 0x3]
+        group = tuple((anchor + axis * i, color) for i in range(length))
+    else:
+        num_players = PUSH_NUM_PLAYERS[length] if kind != INLINE_MOVE \
+            else length
+        group = tuple((anchor + direction * i,
+                       color if i < num_players else 1 - color)
+                      for i in range(length))
+
+    groupmove = (group, direction)
+    _decoded_moves[move] = groupmove
+    return groupmove
+
+
+def encode_optional_move(groupmove) -> int | None:
+    """encode_move, passing None through for searches that found no move."""
+    return encode_move(groupmove) if groupmove is not None else None
+
+
+def decode_optional_move(move: int | None):
+    """decode_move, passing None through for searches that found no move."""
+    return decode_move(move) if move is not None else None
+
+
+def genall_moves_iter(board: dict[int, int],
+                      player_color: int,
+                      order=LARGEST_FIRST_ORDER):
+    """Lazily yields every move of player_color as an encoded move.
+
+    Same moves, in the same orders, as statespace.genall_groupmoves_iter,
+    but without building a tuple for any of them.
+
+    return format explained:
+        output = iterator[encoded_move]
+    """
+    player_marbles = [coord for coord, color in board.items()
+                      if color == player_color]
+
+    if order == GENERATED_ORDER:
+        for coord in player_marbles:
+            for direction in absolute_directions:
+                move = derive_inline_move(board, coord, player_color,
+                                          direction)
+                if move is not None:
+                    yield move
+
+                move = derive_inline_move(board, coord, player_color,
+                                          -direction)
+                if move is not None:
+                    yield move
+
+                for group_size in range(2, derive_group_size(
+                        board, coord, player_color, direction) + 1):
+                    yield from derive_sidestep_moves(board, coord,
+                                                     player_color, direction,
+                                                     group_size)
+
+    elif order == LARGEST_FIRST_ORDER:
+        # inline moves bucketed by length
+        inline_moves = [[], [], [], [], [], []]
+        sidestep_groups = []
+        for coord in player_marbles:
+            for direction in absolute_directions:
+                move = derive_inline_move(board, coord, player_color,
+                                          direction)
+                if move is not None:
+                    inline_moves[move >> MOVE_LENGTH_SHIFT].append(move)
+
+                move = derive_inline_move(board, coord, player_color,
+                                          -direction)
+                if move is not None:
+                    inline_moves[move >> MOVE_LENGTH_SHIFT].append(move)
+
+                group_size = derive_group_size(board, coord, player_color,
+                                               direction)
+                if group_size > 1:
+                    sidestep_groups.append((coord, direction, group_size))
+
+        for group_size in range(5, 0, -1):
+            yield from inline_moves[group_size]
+
+            if 2 <= group_size <= 3:
+                # every group of 3 holds a group of 2 from the same tail
+                for coord, axis, max_group_size in sidestep_groups:
+                    if max_group_size >= group_size:
+                        yield from derive_sidestep_moves(board, coord,
+                                                         player_color, axis,
+                                                         group_size)
+
+    else:
+        yield from sorted(genall_moves_iter(board, player_color,
+                                            GENERATED_ORDER),
+                          key=order)
+
+
+def genall_push_moves(board: dict[int, int],
+                      player_color: int) -> tuple[list[int], list[int]]:
+    """Generates only the sumitos of player_color as encoded moves.
+
+    Same moves as statespace.genall_push_groupmoves.
+
+    return format explained:
+        output = (list[push_off_move], list[push_move])
+    """
+    push_off_moves = []
+    push_moves = []
+
+    for coord, color in board.items():
+        if color != player_color:
+            continue
+        for direction in all_directions:
+            move = derive_inline_move(board, coord, player_color, direction)
+            if move is None:
+                continue
+            kind = move >> MOVE_KIND_SHIFT & 0x3
+            if kind == PUSH_OFF_MOVE:
+                push_off_moves.append(move)
+            elif kind == PUSH_MOVE:
+                push_moves.append(move)
+
+    return push_off_moves, push_moves
+
+
+def derive_inline_move(board: dict[int, int],
+                       coord: int,
+                       player_color: int,
+                       direction: int) -> int | None:
+    """Get the encoded inline move with its tail on coord, for one direction.
+
+    Same walk as statespace.derive_inlinegroupmove, counting marbles
+    instead of collecting them.
+    """
+    num_players = 1
+    num_enemies = 0
+
+    for next_coord in RAYS[coord][direction]:
+        next_color = board.get(next_coord)
+        if next_color is None:
+            if num_players <= num_enemies:
+                return None
+            return (coord | DIRECTION_BITS[direction]
+                    | player_color << MOVE_COLOR_SHIFT
+                    | (PUSH_MOVE if num_enemies else INLINE_MOVE)
+                    << MOVE_KIND_SHIFT
+                    | (num_players + num_enemies) << MOVE_LENGTH_SHIFT)
+
+        if next_color == player_color:
+            if num_enemies or num_players == 3:
+                return None
+            num_players += 1
+        else:
+            num_enemies += 1
+            if num_enemies >= num_players:
+                return None
+
+    if num_enemies:
+        return (coord | DIRECTION_BITS[direction]
+                | player_color << MOVE_COLOR_SHIFT
+                | PUSH_OFF_MOVE << MOVE_KIND_SHIFT
+                | (num_players + num_enemies) << MOVE_LENGTH_SHIFT)
+    return None
+
+
+def derive_group_size(board: dict[int, int],
+                      coord: int,
+                      player_color: int,
+                      axis: int) -> int:
+    """Number of player marbles in a row along axis from coord, at most 3."""
+    group_size = 1
+    for next_coord in RAYS[coord][axis][:2]:
+        if board.get(next_coord) != player_color:
+            break
+        group_size += 1
+    return group_size
+
+
+def derive_sidestep_moves(board: dict[int, int],
+                          coord: int,
+                          player_color: int,
+                          axis: int,
+                          group_size: int) -> list[int]:
+    """Get the encoded sidesteps of the group laid out along axis from coord.
+
+    The group must already be known to hold group_size player marbles.
+    Directions are tried in the same order as
+    statespace.derive_sidestepgroupmoves.
+    """
+    members = (coord,) + RAYS[coord][axis][:group_size - 1]
+    base = (coord | AXIS_INDEX[axis] << MOVE_AXIS_SHIFT
+            | player_color << MOVE_COLOR_SHIFT
+            | SIDESTEP_MOVE << MOVE_KIND_SHIFT
+            | group_size << MOVE_LENGTH_SHIFT)
+
+    sidestep_moves = []
+    for direction in absolute_directions:
+        if direction == axis:
+            continue
+        for side in (direction, -direction):
+            for member in members:
+                new_coord = NEIGHBOURS[member][side]
+                if new_coord is None or new_coord in board:
+                    break
+            else:
+                sidestep_moves.append(base | DIRECTION_BITS[side])
+    return sidestep_moves
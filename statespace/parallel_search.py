@@ -0,0 +1,81 @@
+"""This module contains the parallel searches.
+
+LAZY SMP:
+    several processes run iterative deepening on the same root at once, all
+    sharing one SharedTranspositionTable. They never talk to each other;
+    each one just finds the table already filled in by the others, which
+    lets the main search cut off more and reach deeper in the same time.
+    The helpers start at different depths and search moves in different
+    orders, so they fill in different parts of the tree instead of racing
+    the main search through the same nodes. Only the main search's move is
+    played, and the helpers are stopped as soon as it is done.
+"""
+import contextlib
+import os
+from multiprocessing import Process
+
+from .movecodes import decode_move
+from .search import iterative_deepening
+from .shared_transposition import SharedTranspositionTable
+from .statespace import GENERATED_ORDER, LARGEST_FIRST_ORDER
+
+
+def lazy_smp_search(board, player, time_limit, turns_remaining, eval_callback, transposition_table, num_workers,
+                    symmetric=False, **search_options):
+    """
+    Runs a lazy SMP search with num_workers processes, the calling process being the main one.
+
+    Parameters:
+        board, player, time_limit, turns_remaining, eval_callback, symmetric, search_options: as in
+            search.iterative_deepening_alpha_beta_search
+        transposition_table: the table every process shares. Anything but a SharedTranspositionTable is left
+            untouched, and a temporary shared table is used for this search instead. The caller ages it
+            before the search, like search.iterative_deepening_alpha_beta_search does
+        num_workers: how many processes search, counting the calling process
+
+    Returns:
+        (best_move, transposition_table, elapsed_time): like search.iterative_deepening_alpha_beta_search
+    """
+    shared_table = transposition_table
+    if not isinstance(shared_table, SharedTranspositionTable):
+        shared_table = SharedTranspositionTable()
+
+    helpers = [Process(target=_lazy_smp_helper,
+                       args=(board, player, time_limit, turns_remaining, eval_callback, shared_table, symmetric,
+                             search_options, worker_index),
+                       daemon=True)
+               for worker_index in range(1, num_workers)]
+    for helper in helpers:
+        helper.start()
+
+    try:
+        best_move, elapsed_time = iterative_deepening(board, player, time_limit, turns_remaining, eval_callback,
+                                                      shared_table, symmetric, **search_options)
+    finally:
+        for helper in helpers:
+            helper.terminate()
+        for helper in helpers:
+            helper.join()
+        if shared_table is not transposition_table:
+            shared_table.close()
+            shared_table.unlink()
+
+    if best_move is not None:
+        best_move = decode_move(best_move)
+    print(f"Best Move: {best_move}")
+    return best_move, transposition_table, elapsed_time
+
+
+def _lazy_smp_helper(board, player, time_limit, turns_remaining, eval_callback, shared_table, symmetric,
+                     search_options, worker_index):
+    """
+    Runs the iterative deepening of one helper of a lazy SMP search, quietly.
+
+    Odd helpers start a ply deeper than the main search, and every other pair of helpers searches moves in
+    GENERATED_ORDER instead of largest first.
+    """
+    start_depth = 1 + worker_index % 2
+    order = GENERATED_ORDER if worker_index % 4 >= 2 else LARGEST_FIRST_ORDER
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        iterative_deepening(board, player, time_limit, turns_remaining, eval_callback, shared_table, symmetric,
+                            start_depth, order, **search_options)
@@ -0,0 +1,105 @@
+"""Perft: counting the leaves of the game tree to test move generation.
+
+Perft walks every line of play to a fixed depth and counts the positions it
+reaches. The counts only depend on the rules, so they catch move generation
+bugs, and the time taken gives a throughput figure for the generator that
+does not depend on any heuristic or pruning.
+
+Positions are not checked for game over, every line is walked to the full
+depth.
+"""
+import os
+import time
+
+from . import external
+from .statespace import apply_move, genall_groupmove_resultboard
+
+
+def perft(board: dict[int, int], player: int, depth: int) -> int:
+    """Counts the leaf positions depth plies below board, player to move."""
+    if depth == 0:
+        return 1
+
+    groupmove_resultboards = genall_groupmove_resultboard(board, player)
+    if depth == 1:
+        return len(groupmove_resultboards)
+
+    return sum(perft(resultboard, 1 - player, depth - 1)
+               for _, resultboard in groupmove_resultboards)
+
+
+def divide(board: dict[int, int], player: int, depth: int) \
+        -> dict[tuple[tuple[tuple[int, int], ...], int], int]:
+    """Perft split by root move, for narrowing down where counts disagree.
+
+    return format explained:
+        output = {groupmove: leaf_count}
+    """
+    counts = {}
+    for groupmove, _ in genall_groupmove_resultboard(board, player):
+        child = board.copy()
+        apply_move(child, groupmove)
+        counts[groupmove] = perft(child, 1 - player, depth - 1)
+    return counts
+
+
+def timed_perft(board: dict[int, int], player: int, depth: int) \
+        -> tuple[int, float, float]:
+    """Runs perft and times it.
+
+    return format explained:
+        output = (leaf_count, elapsed_seconds, nodes_per_second)
+    """
+    start_time = time.perf_counter()
+    leaf_count = perft(board, player, depth)
+    elapsed = time.perf_counter() - start_time
+    return leaf_count, elapsed, leaf_count / elapsed if elapsed else 0.0
+
+
+def report_perft(boards: dict, max_depth: int, player: int = 0) -> None:
+    """Prints leaf counts, time and nodes per second for each named board."""
+    for name, board in boards.items():
+        for depth in range(1, max_depth + 1):
+            leaf_count, elapsed, nodes_per_second = \
+                timed_perft(board, player, depth)
+            print(f"{name:<15} depth {depth}: {leaf_count:>10} leaves "
+                  f"{elapsed * 1000:>10.2f}ms {nodes_per_second:>12.0f} nps")
+
+
+def report_divide(board: dict[int, int], player: int, depth: int) -> None:
+    """Prints the divide counts of a board, one root move per line."""
+    counts = divide(board, player, depth)
+    for groupmove, leaf_count in counts.items():
+        print(f"{external.move_to_out(groupmove).strip():<20} {leaf_count}")
+    print(f"{len(counts)} moves, {sum(counts.values())} leaves")
+
+
+def validate_reference_boards(folder_path: str) -> bool:
+    """Checks depth 1 result boards against the reference .board files.
+
+    folder_path holds the in/ folder of .input files and the ref/ folder
+    of expected .board files, laid out like tests/statespace_gen_validation.
+    Every result board has to match the reference, ignoring order.
+    """
+    ref_folder = os.path.join(folder_path, "ref",
+                              os.path.basename(os.path.normpath(folder_path)))
+    all_match = True
+
+    for filename in sorted(os.listdir(ref_folder)):
+        basename = ".".join(filename.split(".")[:-1])
+        board, player_color = external.in_to_marbles(
+            os.path.join(folder_path, "in", f"{basename}.input"))
+
+        with open(os.path.join(ref_folder, filename), 'r') as f:
+            expected = sorted(line.strip() for line in f if line.strip())
+
+        actual = sorted(external.dict_to_out(resultboard).strip()
+                        for _, resultboard
+                        in genall_groupmove_resultboard(board, player_color))
+
+        matches = actual == expected
+        all_match = all_match and matches
+        print(f"{basename:<10} {len(actual):>4} boards, "
+              f"{len(expected):>4} expected: {'ok' if matches else 'MISMATCH'}")
+
+    return all_match
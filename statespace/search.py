@@ -1,140 +1,50 @@
+import math
 import random
-import threading
 import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
 from datetime import datetime
-
-from statespace.statespace import genall_groupmove_resultboard
+from itertools import chain
+
+from statespace.bitboard import bitboard_to_board, board_to_bitboard
+from statespace.movecodes import (MOVE_KIND_SHIFT, PUSH_MOVE, PUSH_OFF_MOVE, decode_move, genall_moves_iter,
+                                  genall_push_moves)
+from statespace.statespace import GENERATED_ORDER, LARGEST_FIRST_ORDER, make_move, unmake_move
+from statespace.symmetry import (INVERSE_TRANSFORMS, symmetric_child_hashes, symmetric_hashes, transform_groupmove,
+                                 transform_move)
+from statespace.transposition import (ENTRY_BOUND, ENTRY_DEPTH, ENTRY_MOVE, ENTRY_VALUE, EXACT_BOUND, LOWER_BOUND,
+                                      UPPER_BOUND, TranspositionTable)
+from statespace.zobrist import SIDE_TO_MOVE_KEY, hashed_positions, zobrist_encoded_move_delta, zobrist_hash
 import hashlib
 
-# A dictionary of unique 64-bit integer hashes representing each position paired with each color marble.
-hashed_positions = {
-    (11, 0): 13694894272781220920,
-    (11, 1): 14607039107576160046,
-    (12, 0): 12693709892929482551,
-    (12, 1): 14493725204674845980,
-    (13, 0): 11463203676548433993,
-    (13, 1): 18119213271117620939,
-    (14, 0): 12359495938082685099,
-    (14, 1): 10412403109875354847,
-    (15, 0): 11116999094423638997,
-    (15, 1): 12150243862170747151,
-    (21, 0): 12924681918484655797,
-    (21, 1): 11460965234069326014,
-    (22, 0): 12034386495406519413,
-    (22, 1): 10780227088564826482,
-    (23, 0): 11938960601893694590,
-    (23, 1): 14559619112162024852,
-    (24, 0): 12232685022164288258,
-    (24, 1): 9875891702377579582,
-    (25, 0): 14654392472509107081,
-    (25, 1): 13358677899696600539,
-    (26, 0): 12153802851024297893,
-    (26, 1): 10062673996909594318,
-    (31, 0): 17521372971143704899,
-    (31, 1): 12565724512120934967,
-    (32, 0): 11821228883889561801,
-    (32, 1): 10218092236808665008,
-    (33, 0): 17755735723983079772,
-    (33, 1): 16253821213361971047,
-    (34, 0): 16479631650207109549,
-    (34, 1): 16386544523088318590,
-    (35, 0): 18046362236802915088,
-    (35, 1): 17388189481887055607,
-    (36, 0): 12671202431223526318,
-    (36, 1): 11659524893831386992,
-    (37, 0): 14130363149572028113,
-    (37, 1): 13085015433835658608,
-    (41, 0): 9609044535182176963,
-    (41, 1): 14997787664625683825,
-    (42, 0): 10525711761213278941,
-    (42, 1): 14356888956056927290,
-    (43, 0): 11803411845767890849,
-    (43, 1): 10506452118256834726,
-    (44, 0): 15381994817000786653,
-    (44, 1): 16481497618897519253,
-    (45, 0): 15975865661950339105,
-    (45, 1): 12630409121559008957,
-    (46, 0): 18086399558477619936,
-    (46, 1): 16889673582640689356,
-    (47, 0): 14570407359895287152,
-    (47, 1): 10697825034959218660,
-    (48, 0): 16634895313163162297,
-    (48, 1): 16688963933093932103,
-    (51, 0): 17930831120325885116,
-    (51, 1): 16375987739413826343,
-    (52, 0): 12272734712569918672,
-    (52, 1): 14657744075201167989,
-    (53, 0): 17811549194283030582,
-    (53, 1): 12694297780214549867,
-    (54, 0): 18039369183295143761,
-    (54, 1): 16554795969378939497,
-    (55, 0): 17750751474568372118,
-    (55, 1): 9558513512501281427,
-    (56, 0): 14669047322159990786,
-    (56, 1): 15499610380008052736,
-    (57, 0): 16227950822117312602,
-    (57, 1): 9579918655293445651,
-    (58, 0): 13481733623910160457,
-    (58, 1): 13565261466864723296,
-    (59, 0): 9791893759840836333,
-    (59, 1): 17679845650462314898,
-    (62, 0): 13597273410557151150,
-    (62, 1): 17124689689321909696,
-    (63, 0): 11871795971716157665,
-    (63, 1): 10948423374857701664,
-    (64, 0): 17653915202736172726,
-    (64, 1): 14755599962027521720,
-    (65, 0): 13534909953928563610,
-    (65, 1): 14645545458582298826,
-    (66, 0): 16457188899270023974,
-    (66, 1): 17085927068508068243,
-    (67, 0): 17995808181362736213,
-    (67, 1): 12829123630851451409,
-    (68, 0): 9472541027303409184,
-    (68, 1): 10311951967998793383,
-    (69, 0): 9933732719256774259,
-    (69, 1): 9945103606825254368,
-    (73, 0): 14904677903008461176,
-    (73, 1): 18373506872902009240,
-    (74, 0): 13357699899619609047,
-    (74, 1): 10391849480190001304,
-    (75, 0): 12548168994326596983,
-    (75, 1): 10966963903587073077,
-    (76, 0): 11110414072760217765,
-    (76, 1): 12239628134674514448,
-    (77, 0): 14375377289524518524,
-    (77, 1): 11120810800425461820,
-    (78, 0): 10804273848964161440,
-    (78, 1): 16867361814729927085,
-    (79, 0): 16702681525347858181,
-    (79, 1): 12167884145219344782,
-    (84, 0): 15933121772490062877,
-    (84, 1): 9780219023090179513,
-    (85, 0): 16104918890775603883,
-    (85, 1): 12566099435282393223,
-    (86, 0): 16489877483690276183,
-    (86, 1): 18124582226366132624,
-    (87, 0): 15899646159992549596,
-    (87, 1): 9824628651409526889,
-    (88, 0): 17513049418760900999,
-    (88, 1): 12045723817283264809,
-    (89, 0): 15979904495216373935,
-    (89, 1): 13434488723735840853,
-    (95, 0): 13055796027323318259,
-    (95, 1): 15903220087263454271,
-    (96, 0): 13062438335302049215,
-    (96, 1): 10739631755291793903,
-    (97, 0): 14099345540809372355,
-    (97, 1): 17284072150546910608,
-    (98, 0): 12935508047823904349,
-    (98, 1): 10049904970226576526,
-    (99, 0): 12041852297255749268,
-    (99, 1): 17104206928422623240
-}
 
 # maps a board hash to the value calculated by the evaluation function
 # transposition_table = {}
 
+# ways iterative_deepening_alpha_beta_search can search with more than one process
+LAZY_SMP_MODE = "lazy_smp"
+ROOT_SPLIT_MODE = "root_split"
+
+# a good aspiration_window for cam_heuristic: half the width of the window an iteration first searches with,
+# around the value of the iteration before. Searches only use a window when given one
+ASPIRATION_WINDOW = 0.05
+# how much wider the window gets each time a search falls outside it
+ASPIRATION_GROWTH = 4
+# after this many searches fall outside the window, the next one searches with the full window
+ASPIRATION_MAX_RE_SEARCHES = 3
+
+# how many plies of sumitos a quiescence search follows past the horizon at most
+QUIESCENCE_MAX_DEPTH = 4
+
+# defaults of the null move options of SearchContext
+NULL_MOVE_REDUCTION = 2
+NULL_MOVE_MIN_DEPTH = 3
+NULL_MOVE_MIN_MARBLES = 10
+
+# defaults of the late move reduction options of SearchContext
+LMR_REDUCTION = 1
+LMR_MIN_DEPTH = 3
+LMR_MIN_MOVES = 4
+
 first_moves_dict = {
     # Belgian Daisy First moves
     (1835253602899219050, 1): (((11, 0), (22, 0), (33, 0)), 11),
@@ -174,8 +84,34 @@ first_moves_dict = {
 }
 
 
+def lookup_first_move(board, choice, symmetric=False):
+    """
+    Looks up one of the stored opening moves for black in first_moves_dict.
+
+    Parameters:
+        board: a dict representation of the marbles on the board
+        choice: which of the stored moves for that board to return, from 1 to 10
+        symmetric: if True, any rotation or mirror of a stored board matches too, and the stored move is mapped back
+            onto board
+
+    Returns:
+        first_move: the stored groupmove. Raises KeyError if board has no stored moves
+    """
+    if not symmetric:
+        return first_moves_dict[(hash_board_state(board), choice)]
+
+    # symmetric_hashes(board, 0)[t] is the hash_board_state of board under transform t
+    for transform, board_hash in enumerate(symmetric_hashes(board, 0)):
+        first_move = first_moves_dict.get((board_hash, choice))
+        if first_move is not None:
+            return transform_groupmove(first_move, INVERSE_TRANSFORMS[transform])
+    raise KeyError((hash_board_state(board), choice))
+
+
 def iterative_deepening_alpha_beta_search(board, player, time_limit, turns_remaining, eval_callback,
-                                          transposition_table, is_first_move=False, t_table_filename="transposition_table.json"):
+                                          transposition_table, is_first_move=False, t_table_filename="transposition_table.json",
+                                          symmetric=False, num_workers=1, parallel_mode=LAZY_SMP_MODE,
+                                          **search_options):
     """
     Makes calls to alpha_beta_search, incrementing the depth each loop.
 
@@ -187,23 +123,79 @@ def iterative_deepening_alpha_beta_search(board, player, time_limit, turns_remai
         time_limit: the total allotted time for this move to be determined in milliseconds. Should be accurate to 1/100th of a second
         player: a value, 0 or 1, indicating whose turn it is
         turns_remaining: the total remaining turns for the current player
-        transposition_table: a transition table containing a board mapped to that board's evaluation
+        transposition_table: a transposition table mapping board hashes to entries, see statespace.transposition.
+            Kept between calls, so later moves start from what earlier searches learned
         is_first_move: a boolean indicating if this is the first move of the game. Used to pick from a list of random first moves.
         t_table_filename: Name of the file to load the t_table from if it has yet to be loaded
+        symmetric: if True, the transposition table is keyed by canonical hash and first moves are also found for
+            rotated or mirrored layouts. Only for heuristics that score symmetric positions the same
+        num_workers: how many processes search at once
+        parallel_mode: how more than 1 worker search, LAZY_SMP_MODE (see statespace.parallel_search) or
+            ROOT_SPLIT_MODE (see root_split_search)
+        search_options: options of every search, like pvs=True, see SearchContext. aspiration_window is passed on
+            to iterative_deepening instead
     Returns:
-        best_move: the best move found from all iterations the alpha-beta search
+        best_move: the best move found from all iterations the alpha-beta search, as a groupmove
     """
 
     if is_first_move and player == 0:
-        first_move = first_moves_dict[(hash_board_state(board), random.randint(1, 10))]
+        first_move = lookup_first_move(board, random.randint(1, 10), symmetric)
         print(f"First Move: {first_move}")
         return first_move, transposition_table, 0
 
-    start_time = datetime.now()
-    depth = 1
+    # bounded tables age out what the searches of earlier moves stored
+    new_search = getattr(transposition_table, 'new_search', None)
+    if new_search is not None:
+        new_search()
+
+    # killer moves and history are aged like the table, but kept for every kind of search
+    move_ordering = search_options.get('move_ordering')
+    if move_ordering is not None:
+        move_ordering.new_search()
+
+    if num_workers > 1 and parallel_mode == ROOT_SPLIT_MODE:
+        return root_split_search(board, player, time_limit, turns_remaining, eval_callback, transposition_table,
+                                 num_workers, symmetric, **search_options)
+
+    if num_workers > 1:
+        # imported here since lazy SMP searches need NumPy for their shared table
+        from statespace.parallel_search import lazy_smp_search
+        return lazy_smp_search(board, player, time_limit, turns_remaining, eval_callback, transposition_table,
+                               num_workers, symmetric, **search_options)
+
+    best_move, elapsed_time = iterative_deepening(board, player, time_limit, turns_remaining, eval_callback,
+                                                  transposition_table, symmetric, **search_options)
+    # moves are encoded ints inside the search, callers get a groupmove back
+    if best_move is not None:
+        best_move = decode_move(best_move)
+    print(f"Best Move: {best_move}")
+    return best_move, transposition_table, elapsed_time
+
+
+def iterative_deepening(board, player, time_limit, turns_remaining, eval_callback, transposition_table,
+                        symmetric=False, start_depth=1, order=LARGEST_FIRST_ORDER, aspiration_window=None,
+                        **search_options):
+    """
+    The iterative deepening loop of iterative_deepening_alpha_beta_search, on its own.
+
+    Parameters:
+        board, player, time_limit, turns_remaining, eval_callback, transposition_table, symmetric, search_options:
+            as in iterative_deepening_alpha_beta_search
+        start_depth: the depth of the first iteration
+        order: the order moves are searched in, see SearchContext
+        aspiration_window: half the width of the window every iteration after the first starts with, around the value
+            of the iteration before, see run_aspiration_search. None, the default, searches every iteration with the
+            full window. Window widths depend on the scale of eval_callback, ASPIRATION_WINDOW suits cam_heuristic
+
+    Returns:
+        (best_move, elapsed_time): the best move of the deepest iteration that finished, as an encoded move
+    """
+    start_time = time.monotonic()
+    depth = start_depth
     total_turns_remaining = turns_remaining * 2 - player
     best_move = None
     best_index = None
+    best_value = None
     cur_path = []
     elapsed_time = 0
     best_move_search_time = 0
@@ -211,68 +203,50 @@ def iterative_deepening_alpha_beta_search(board, player, time_limit, turns_remai
 
     careful_thresh_seconds = time_limit_seconds * 0.05 # if an iteration is started past this time, it will be a careful search
     full_cutoff_thresh_seconds = time_limit_seconds - 0.1
+    deadline = start_time + full_cutoff_thresh_seconds  # careful searches are cancelled once this passes
 
     # The loop will end before the time limit if the maximum depth (based on turns remaining) is reached.
     while depth <= total_turns_remaining:
-        elapsed_time = (datetime.now() - start_time).total_seconds()
+        elapsed_time = time.monotonic() - start_time
 
         temp_move = None
         temp_index = None
+        temp_value = None
+        re_searches = 0
+
+        search = SearchContext(board, player, time_limit_seconds - elapsed_time, eval_callback, transposition_table,
+                               depth, path=cur_path, order=order, symmetric=symmetric, **search_options)
+        window = aspiration_window if best_value is not None else None
 
         if elapsed_time > careful_thresh_seconds:
             print("CAREFUL THRESH REACHED:")
 
-            stop_flag = threading.Event()
-
-            kwargs = dict(init_board=board, ply_board=board,
-                          alpha=float('-inf'), beta=float('inf'),
-                          depth=depth, max_player=player, cur_ply_player=player,
-                          time_limit=time_limit_seconds - elapsed_time,
-                          total_turns_remaining=total_turns_remaining,
-                          eval_callback=eval_callback,
-                          transposition_table=transposition_table,
-                          end_of_time_flag=stop_flag,
-                          path=cur_path,
-                          total_depth=depth
-                          )
-
-            search_thread = CarefulABThread(
-                target=careful_alpha_beta_search_transposition, kwargs=kwargs
-            )
-
             careful_search_time = full_cutoff_thresh_seconds - elapsed_time
             if careful_search_time >= 0.1:
-                search_thread.start()
-                print(f"{elapsed_time}s, Attempting careful search for an additional {careful_search_time} seconds")
-                print(f"beginning careful search for {careful_search_time} seconds")
-                time.sleep(careful_search_time)
-                stop_flag.set()
-                temp_move, temp_index, _ = search_thread.join()
+                print(f"{elapsed_time}s, Attempting careful search for up to {careful_search_time} seconds")
+                search.deadline = deadline
+                temp_move, temp_index, temp_value, re_searches = run_aspiration_search(
+                    search, board.copy(), depth, player, total_turns_remaining, best_value, window)
             else:
                 print(f"search time requested for {careful_search_time}s. no point :( ending search")
 
-
         elif elapsed_time <= careful_thresh_seconds:
             print("RECKLESS:")
             print("ELAPSED TIME:", elapsed_time)
-            temp_move, temp_index, _ = reckless_alpha_beta_search_transposition(
-                init_board=board, ply_board=board,
-                alpha=float('-inf'), beta=float('inf'),
-                depth=depth, max_player=player, cur_ply_player=player,
-                time_limit=time_limit_seconds - elapsed_time,
-                total_turns_remaining=total_turns_remaining,
-                eval_callback=eval_callback,
-                transposition_table=transposition_table,
-                path=cur_path,
-                total_depth=depth
-            )
+            temp_move, temp_index, temp_value, re_searches = run_aspiration_search(
+                search, board.copy(), depth, player, total_turns_remaining, best_value, window)
 
-        elapsed_time = (datetime.now() - start_time).total_seconds()
+        elapsed_time = time.monotonic() - start_time
         print("TEMP MOVE:", temp_move)
+        print("RE-SEARCHES:", re_searches)
+        print("NODES:", search.nodes)
+        if search.lmr:
+            print("LATE MOVES REDUCED:", search.lmr_reductions, "RE-SEARCHED:", search.lmr_re_searches)
 
         if temp_move is not None:
             best_move = temp_move
             best_index = temp_index
+            best_value = temp_value
             best_move_search_time = elapsed_time
             depth += 1
         else:
@@ -290,8 +264,7 @@ def iterative_deepening_alpha_beta_search(board, player, time_limit, turns_remai
     print(f"Total Elapsed Time: {elapsed_time * 1000:.2f}ms/{time_limit:.2f}ms ")
     print(f"Depth Reached: {depth}")
     print(f"Path: {cur_path}")
-    print(f"Best Move: {best_move}")
-    return best_move, transposition_table, elapsed_time
+    return best_move, elapsed_time
 
 
 def iterative_deepening_alpha_beta_search_by_depth(board, player, depth, turns_remaining, eval_callback, ab_callback,
@@ -310,7 +283,7 @@ def iterative_deepening_alpha_beta_search_by_depth(board, player, depth, turns_r
     best_move = None
 
     while cur_depth <= depth and cur_depth <= turns_remaining:
-        best_move, best_index, _ = ab_callback(board, board, float('-inf'), float('inf'), cur_depth, cur_depth, player, player, 0, turns_remaining, eval_callback, transposition_table, cur_path)
+        best_move, best_index, _ = ab_callback(board, board.copy(), float('-inf'), float('inf'), cur_depth, cur_depth, player, player, 0, turns_remaining, eval_callback, transposition_table, cur_path)
         elapsed_time = (datetime.now() - start_time).total_seconds()
         if cur_path[0] != best_index:
             cur_path = [best_index]
@@ -321,143 +294,596 @@ def iterative_deepening_alpha_beta_search_by_depth(board, player, depth, turns_r
         print(f"Path: {cur_path}")
         cur_depth += 1
 
+    if best_move is not None:
+        best_move = decode_move(best_move)
     return best_move, cur_path, transposition_table
 
-class CarefulABThread(threading.Thread):
+def root_split_search(board, player, time_limit, turns_remaining, eval_callback, transposition_table, num_workers,
+                      symmetric=False, aspiration_window=None, **search_options):
+    """
+    Runs iterative deepening with the root moves of each iteration split over a pool of worker processes.
+
+    Each iteration searches the first root move itself to get a bound, young brothers wait style, then hands the
+    other root moves to the pool, at most num_workers at a time. Every move is sent with the best value found so
+    far, so moves sent later are searched with a tighter window. Iterations past the first stop at the same deadline
+    as a careful search, and an iteration that doesn't finish is thrown away.
+
+    Parameters:
+        board, player, time_limit, turns_remaining, eval_callback, transposition_table, symmetric, search_options:
+            as in iterative_deepening_alpha_beta_search. transposition_table is only used for the first root move, each
+            worker keeps a table of its own
+        num_workers: how many worker processes the pool has
+        aspiration_window: as in iterative_deepening, used for the first root move, around its value in the
+            iteration before. None, the default, searches it with the full window
+
+    Returns:
+        (best_move, transposition_table, elapsed_time): like iterative_deepening_alpha_beta_search
+    """
+    global _root_split_search_id
+
+    start_time = time.monotonic()
+    time_limit_seconds = time_limit / 1000.0
+    deadline = start_time + time_limit_seconds - 0.1
+    total_turns_remaining = turns_remaining * 2 - player
+    pool = _get_root_split_pool(num_workers)
+    _root_split_search_id += 1
+
+    # boards are sent to the workers as a bitboard, a pair of ints
+    bitboard = board_to_bitboard(board)
+    root_moves = list(genall_moves_iter(board, player))
+    root_values = {}
+    best_move = None
+    depth = 1
+
+    while depth <= total_turns_remaining and root_moves:
+        elapsed_time = time.monotonic() - start_time
+        if depth > 1 and elapsed_time > time_limit_seconds - 0.2:
+            break
+        iteration_deadline = deadline if depth > 1 else None
+
+        # the best moves of the last iteration go first
+        root_moves.sort(key=lambda move: root_values.get(move, float('-inf')), reverse=True)
+
+        first_move = root_moves[0]
+        ply_board = board.copy()
+        make_move(ply_board, decode_move(first_move))
+        search = SearchContext(board, player, time_limit_seconds - elapsed_time, eval_callback, transposition_table,
+                               depth - 1, deadline=iteration_deadline, symmetric=symmetric, **search_options)
+        _, _, alpha, _ = run_aspiration_search(search, ply_board, depth - 1, 1 - player, total_turns_remaining - 1,
+                                               root_values.get(first_move), aspiration_window)
+        if alpha is None:
+            break
+
+        iteration_values = {first_move: alpha}
+        iteration_best = first_move
+        pending = root_moves[:0:-1]
+        futures = {}
+        cancelled = False
+
+        while pending or futures:
+            while pending and len(futures) < num_workers:
+                move = pending.pop()
+                futures[pool.submit(_search_root_move, _root_split_search_id, bitboard, player, move, depth - 1,
+                                    alpha, total_turns_remaining - 1, time_limit_seconds - elapsed_time,
+                                    eval_callback, iteration_deadline, symmetric, search_options)] = move
+
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                move = futures.pop(future)
+                value = future.result()
+                if value is None:
+                    cancelled = True
+                    continue
+                iteration_values[move] = value
+                if value > alpha:
+                    alpha = value
+                    iteration_best = move
+
+            if cancelled:
+                pending.clear()
+
+        if cancelled:
+            break
+
+        best_move = iteration_best
+        root_values = iteration_values
+        depth += 1
+
+    elapsed_time = time.monotonic() - start_time
+    print("\n=======FINISHED========")
+    print(f"Total Elapsed Time: {elapsed_time * 1000:.2f}ms/{time_limit:.2f}ms ")
+    print(f"Depth Reached: {depth - 1}")
+    if best_move is not None:
+        best_move = decode_move(best_move)
+    print(f"Best Move: {best_move}")
+    return best_move, transposition_table, elapsed_time
+
+
+# the pool of root_split_search, kept between searches, and the table of each of its workers
+_root_split_pool = None
+_root_split_pool_size = 0
+_root_split_search_id = 0
+_worker_transposition_table = None
+_worker_search_id = None
+
+
+def _get_root_split_pool(num_workers):
+    """The persistent root_split_search pool, restarted if num_workers changed."""
+    global _root_split_pool, _root_split_pool_size
+    if _root_split_pool is None or _root_split_pool_size != num_workers:
+        if _root_split_pool is not None:
+            _root_split_pool.shutdown(cancel_futures=True)
+        _root_split_pool = ProcessPoolExecutor(num_workers)
+        _root_split_pool_size = num_workers
+    return _root_split_pool
+
+
+def shutdown_root_split_pool():
+    """Stops the worker processes of root_split_search, if it started any."""
+    global _root_split_pool, _root_split_pool_size
+    if _root_split_pool is not None:
+        _root_split_pool.shutdown(cancel_futures=True)
+        _root_split_pool = None
+        _root_split_pool_size = 0
+
+
+def _search_root_move(search_id, bitboard, player, move, depth, alpha, total_turns_remaining, time_limit,
+                      eval_callback, deadline, symmetric, search_options):
+    """
+    Searches one root move in a root_split_search worker.
+
+    Returns:
+        the move's value for player, exact if it is above alpha, or None if the deadline passed
+    """
+    global _worker_transposition_table, _worker_search_id
+    if _worker_transposition_table is None:
+        _worker_transposition_table = TranspositionTable()
+    if search_id != _worker_search_id:
+        _worker_transposition_table.new_search()
+        _worker_search_id = search_id
+
+    board = bitboard_to_board(bitboard)
+    ply_board = board.copy()
+    make_move(ply_board, decode_move(move))
+    search = SearchContext(board, player, time_limit, eval_callback, _worker_transposition_table, depth,
+                           deadline=deadline, symmetric=symmetric, **search_options)
+    _, _, value = run_search(search, ply_board, alpha, float('inf'), depth, 1 - player, total_turns_remaining)
+    return value
 
-    def __init__(self, group=None, target=None, name=None,
-                 args=(), kwargs={}, Verbose=None):
-        threading.Thread.__init__(self, group, target, name, args, kwargs)
-        self._return = None
 
-    def run(self):
-        if self._target is not None:
-            self._return = self._target(*self._args, **self._kwargs)
+class SearchCancelled(Exception):
+    """Raised inside negamax_search when its should_stop hook asks it to stop."""
+
+
+# how many nodes are searched between checks of a search's deadline and should_stop hook
+STOP_CHECK_INTERVAL = 128
+
+
+class SearchContext:
+    """
+    Everything about a search that stays the same from node to node.
+
+    The hooks are what the wrappers below plug in:
+        should_stop: a callable checked every STOP_CHECK_INTERVAL nodes, or None. Returning True cancels the search
+        deadline: a time.monotonic() time checked every STOP_CHECK_INTERVAL nodes, or None. Once it passes, the
+            search is cancelled
+        transposition_table: any mapping from a board hash to a transposition table entry, see
+            statespace.transposition. Probed at every node for a cutoff or a move to try first
+        order: the order genall_moves_iter yields moves in, LARGEST_FIRST_ORDER, GENERATED_ORDER or a sort key
+        symmetric: if True, board hashes are tuples of symmetric_hashes, and the table is keyed by canonical hash
+
+    The options change how the tree is searched, and are what **search_options of the functions below are passed on
+    as:
+        pvs: if True, a principal variation search. Only the first move of a node gets the full window, every other
+            move is first searched with a null window that only tells whether it beats alpha, and searched again
+            with the full window if it does
+        quiescence: if True, boards at the horizon are not evaluated straight away, see quiescence_search
+        null_move: if True, null move pruning. Before searching any move, a node lets the enemy move twice, searched
+            null_move_reduction plies shallower than the node's moves with a null window at beta. If the enemy
+            still can't bring the value under beta, the node cuts off without searching a single move
+        null_move_reduction: how many plies shallower than usual the null move is searched
+        null_move_min_depth: null moves are only tried this many plies or more above the horizon
+        null_move_min_marbles: null moves are only tried while the player to move has this many marbles or more. With
+            fewer, a single push-off can decide the game and passing is too risky to assume
+        lmr: if True, late move reductions. Quiet moves, anything but a sumito, that come late in a node's move order
+            are first searched lmr_reduction plies shallower with a null window at alpha, and only searched again at
+            the full depth if they beat alpha
+        lmr_reduction: how many plies shallower late quiet moves are searched
+        lmr_min_depth: late moves are only reduced this many plies or more above the horizon
+        lmr_min_moves: how many moves of a node are searched at the full depth before any is reduced
+        move_ordering: a statespace.move_ordering.MoveOrdering, or None. If given, moves are sorted by the killer
+            moves, counter moves and history it learns from every cutoff, instead of generated lazily in order. Pass
+            the same one to every search of a game, so it carries over between iterations and moves
+
+    lmr_reductions and lmr_re_searches count the late moves that were reduced, and how many of those had to be
+    searched again.
+    """
+    __slots__ = ('init_board', 'max_player', 'time_limit', 'eval_callback', 'transposition_table', 'total_depth',
+                 'path', 'should_stop', 'deadline', 'order', 'symmetric', 'pvs', 'quiescence', 'null_move',
+                 'null_move_reduction', 'null_move_min_depth', 'null_move_min_marbles', 'lmr', 'lmr_reduction',
+                 'lmr_min_depth', 'lmr_min_moves', 'move_ordering', 'marble_counts', 'nodes', 'next_check',
+                 'lmr_reductions', 'lmr_re_searches')
+
+    def __init__(self, init_board, max_player, time_limit, eval_callback, transposition_table, total_depth,
+                 path=None, should_stop=None, deadline=None, order=LARGEST_FIRST_ORDER, symmetric=False, pvs=False,
+                 quiescence=False, null_move=False, null_move_reduction=NULL_MOVE_REDUCTION,
+                 null_move_min_depth=NULL_MOVE_MIN_DEPTH, null_move_min_marbles=NULL_MOVE_MIN_MARBLES, lmr=False,
+                 lmr_reduction=LMR_REDUCTION, lmr_min_depth=LMR_MIN_DEPTH, lmr_min_moves=LMR_MIN_MOVES,
+                 move_ordering=None):
+        self.init_board = init_board
+        self.max_player = max_player
+        self.time_limit = time_limit
+        self.eval_callback = eval_callback
+        self.transposition_table = transposition_table
+        self.total_depth = total_depth
+        self.path = path
+        self.should_stop = should_stop
+        self.deadline = deadline
+        self.order = order
+        self.symmetric = symmetric
+        self.pvs = pvs
+        self.quiescence = quiescence
+        self.null_move = null_move
+        self.null_move_reduction = null_move_reduction
+        self.null_move_min_depth = null_move_min_depth
+        self.null_move_min_marbles = null_move_min_marbles
+        self.lmr = lmr
+        self.lmr_reduction = lmr_reduction
+        self.lmr_min_depth = lmr_min_depth
+        self.lmr_min_moves = lmr_min_moves
+        self.move_ordering = move_ordering
+        # marbles of each colour left on ply_board, kept up to date as moves are made and unmade
+        self.marble_counts = [0, 0]
+        self.nodes = 0
+        self.next_check = STOP_CHECK_INTERVAL
+        self.lmr_reductions = 0
+        self.lmr_re_searches = 0
+
+    def check_stop(self):
+        """Raises SearchCancelled if the deadline has passed or should_stop says so, and schedules the next check."""
+        self.next_check = self.nodes + STOP_CHECK_INTERVAL
+        if self.deadline is not None and time.monotonic() >= self.deadline:
+            raise SearchCancelled
+        if self.should_stop is not None and self.should_stop():
+            raise SearchCancelled
+
+
+def run_search(search, ply_board, alpha, beta, depth, cur_ply_player, total_turns_remaining, board_hash=None):
+    """
+    Runs negamax_search from ply_board and translates its result back to max_player's point of view.
+
+    Parameters:
+        search: the SearchContext of this search
+        alpha, beta: the window, as values for max_player
+        board_hash: the hash of ply_board with cur_ply_player to move. Computed if not given
+
+    Returns:
+        (best_move, path_move, best_value): like the alpha-beta search functions below, or (None, None, None) if
+        the search was cancelled
+    """
+    if board_hash is None:
+        board_hash = symmetric_hashes(ply_board, cur_ply_player) if search.symmetric \
+            else zobrist_hash(ply_board, cur_ply_player)
+    search.marble_counts = [num_player_marbles(0, ply_board), num_player_marbles(1, ply_board)]
+
+    # negamax scores every node for the player to move there, so min nodes see the window flipped
+    if cur_ply_player == search.max_player:
+        sign, alpha, beta = 1, alpha, beta
+    else:
+        sign, alpha, beta = -1, -beta, -alpha
+
+    try:
+        best_move, best_value = negamax_search(search, ply_board, alpha, beta, depth, search.total_depth - depth,
+                                               cur_ply_player, total_turns_remaining, board_hash,
+                                               search.path is not None)
+    except SearchCancelled:
+        return None, None, None
+    return best_move, best_move, sign * best_value
+
+
+def run_aspiration_search(search, ply_board, depth, cur_ply_player, total_turns_remaining, guess, window):
+    """
+    Runs run_search with a narrow window around a guess of the value, widening it until the value falls inside.
+
+    A search that fails low or high only gives a bound, so it is searched again with the window grown
+    ASPIRATION_GROWTH times wider past that bound. After ASPIRATION_MAX_RE_SEARCHES of those, the last search gets the
+    full window.
+
+    Parameters:
+        search, ply_board, depth, cur_ply_player, total_turns_remaining: as in run_search
+        guess: the expected value, for max_player, usually the value of the iteration before. None for no guess
+        window: half the width of the first window. None searches with the full window straight away
+
+    Returns:
+        (best_move, path_move, best_value, re_searches): like run_search, with how many times it searched again
+    """
+    alpha, beta = float('-inf'), float('inf')
+    if guess is not None and window is not None:
+        alpha, beta = guess - window, guess + window
+
+    re_searches = 0
+    while True:
+        best_move, path_move, best_value = run_search(search, ply_board, alpha, beta, depth, cur_ply_player,
+                                                      total_turns_remaining)
+        if best_value is None or alpha < best_value < beta or (alpha == float('-inf') and beta == float('inf')):
+            return best_move, path_move, best_value, re_searches
+
+        re_searches += 1
+        window *= ASPIRATION_GROWTH
+        if re_searches >= ASPIRATION_MAX_RE_SEARCHES:
+            alpha, beta = float('-inf'), float('inf')
+        elif best_value <= alpha:
+            alpha = best_value - window
+        else:
+            beta = best_value + window
+
+
+def negamax_search(search, ply_board, alpha, beta, depth, ply, cur_ply_player, total_turns_remaining, board_hash,
+                   on_path, allow_null=True, previous_move=None):
+    """
+    The alpha-beta search every other search function in this module is built on.
+
+    ply_board is searched in place, with each move made and then unmade. The principal path move is searched
+    first, then everything else lazily in search.order.
+
+    Parameters:
+        search: the SearchContext of this search
+        ply_board: a dict representation of the marbles on the board at this node
+        alpha, beta: the window, as values for cur_ply_player
+        depth: how many more plies to search before the state is evaluated
+        ply: how many plies below the root of the search ply_board is, null moves included. Not total_depth - depth,
+            since null moves and late move reductions take more than a ply of depth off
+        cur_ply_player: a value, 0(black) or 1(white), indicating whose turn it is in the current ply
+        total_turns_remaining: the total remaining turns for both players
+        board_hash: the hash of ply_board with cur_ply_player to move, see SearchContext.symmetric
+        on_path: True if every move so far was the principal path move
+        allow_null: False right after a null move, so the same player never passes twice in a row
+        previous_move: the move that led to ply_board, or None at the root or after a null move
+
+    Returns:
+        (best_move, best_value): the best move for cur_ply_player and its value, for cur_ply_player. best_move is
+        None if a null move cut the node off
+    """
+    search.nodes += 1
+    if search.nodes >= search.next_check:
+        search.check_stop()
+
+    symmetric = search.symmetric
+    marble_counts = search.marble_counts
+    transposition_table = search.transposition_table
+    tt_key = min(board_hash) if symmetric else board_hash
+    entry = transposition_table.get(tt_key)
+
+    if depth == 0 or total_turns_remaining == 0 or marble_counts[cur_ply_player] == 8:
+        # an exact value from any depth is at least as good as evaluating again
+        if entry is not None and entry[ENTRY_BOUND] == EXACT_BOUND:
+            return None, entry[ENTRY_VALUE]
+        if search.quiescence and depth == 0:
+            # only a bound within this window, so it is not stored
+            return None, quiescence_search(search, ply_board, alpha, beta, QUIESCENCE_MAX_DEPTH, cur_ply_player,
+                                           total_turns_remaining)
+        value = evaluate(search, ply_board, cur_ply_player, total_turns_remaining)
+        if entry is None:
+            transposition_table[tt_key] = (tt_key, 0, value, EXACT_BOUND, None)
+        return None, value
+
+    path = search.path
+    path_move = None
+    if on_path:
+        if len(path) > ply:
+            path_move = path[ply]
+        else:
+            path.append(None)
+
+    # moves in the table are stored in the canonical board's frame in symmetric searches
+    transform = board_hash.index(tt_key) if symmetric else 0
+    tt_move = None
+    if entry is not None:
+        tt_move = entry[ENTRY_MOVE]
+        if tt_move is not None and transform:
+            tt_move = transform_move(tt_move, INVERSE_TRANSFORMS[transform])
+
+        # nodes on the principal path are always searched, so the path gets filled in
+        if entry[ENTRY_DEPTH] >= depth and not on_path:
+            value = entry[ENTRY_VALUE]
+            bound = entry[ENTRY_BOUND]
+            if bound == EXACT_BOUND or (bound == LOWER_BOUND and value >= beta) \
+                    or (bound == UPPER_BOUND and value <= alpha):
+                return tt_move, value
+
+    enemy = 1 - cur_ply_player
+    if search.null_move and allow_null and not on_path and depth < search.total_depth and beta < math.inf \
+            and depth >= search.null_move_min_depth \
+            and marble_counts[cur_ply_player] >= search.null_move_min_marbles:
+        null_hash = tuple(key ^ SIDE_TO_MOVE_KEY for key in board_hash) if symmetric \
+            else board_hash ^ SIDE_TO_MOVE_KEY
+        _, value = negamax_search(search, ply_board, -beta, -math.nextafter(beta, -math.inf),
+                                  max(depth - 1 - search.null_move_reduction, 0), ply + 1, enemy,
+                                  total_turns_remaining - 1, null_hash, False, False)
+        if -value >= beta:
+            return None, -value
+
+    # the principal path move is searched first, or else the table's best move, then everything else lazily, or
+    # sorted by what earlier cutoffs taught search.move_ordering
+    first_move = path_move if path_move is not None else tt_move
+    move_ordering = search.move_ordering
+    moves = genall_moves_iter(ply_board, cur_ply_player, search.order)
+    if move_ordering is not None:
+        moves = move_ordering.order(moves, ply, previous_move, first_move)
+    elif first_move is not None:
+        moves = chain((first_move,), (move for move in moves if move != first_move))
+
+    pvs = search.pvs
+    reduce_late_moves = search.lmr and depth >= search.lmr_min_depth
+    alpha_orig = alpha
+    best_value = float('-inf')
+    best_move = None
+
+    for move_index, move in enumerate(moves):
+        child_hash = symmetric_child_hashes(board_hash, move) if symmetric \
+            else board_hash ^ zobrist_encoded_move_delta(move)
+        kind = move >> MOVE_KIND_SHIFT & 0x3
+        push_off = kind == PUSH_OFF_MOVE
+        if push_off:
+            marble_counts[enemy] -= 1
+        child_on_path = path_move is not None and move == path_move
+        undo_record = make_move(ply_board, decode_move(move))
+        # cancelled searches raise SearchCancelled from deep inside, the board still has to be unmade on the way up
+        try:
+            # late quiet moves are first searched shallower, see SearchContext.lmr
+            value = None
+            if reduce_late_moves and move_index >= search.lmr_min_moves and kind != PUSH_MOVE and not push_off \
+                    and not child_on_path:
+                search.lmr_reductions += 1
+                _, value = negamax_search(search, ply_board, -math.nextafter(alpha, math.inf), -alpha,
+                                          max(depth - 1 - search.lmr_reduction, 0), ply + 1, enemy,
+                                          total_turns_remaining - 1, child_hash, False, previous_move=move)
+                if -value > alpha:
+                    search.lmr_re_searches += 1
+                    value = None
+
+            # a reduced search that failed low already settles the move
+            if value is None and pvs and best_move is not None:
+                # values are floats, so the null window reaches only to the next float above alpha. No value fits
+                # strictly inside it, so the search either fails low or fails high, exactly when the move beats alpha
+                _, value = negamax_search(search, ply_board, -math.nextafter(alpha, math.inf), -alpha, depth - 1,
+                                          ply + 1, enemy, total_turns_remaining - 1, child_hash, child_on_path,
+                                          previous_move=move)
+                if alpha < -value < beta:
+                    _, value = negamax_search(search, ply_board, -beta, -alpha, depth - 1, ply + 1, enemy,
+                                              total_turns_remaining - 1, child_hash, child_on_path, previous_move=move)
+            elif value is None:
+                _, value = negamax_search(search, ply_board, -beta, -alpha, depth - 1, ply + 1, enemy,
+                                          total_turns_remaining - 1, child_hash, child_on_path, previous_move=move)
+        finally:
+            unmake_move(ply_board, undo_record)
+            if push_off:
+                marble_counts[enemy] += 1
+
+        value = -value
+        if value > best_value:
+            best_value = value
+            best_move = move
+        if value >= beta:
+            if move_ordering is not None:
+                move_ordering.record_cutoff(move, ply, depth, previous_move)
+            break
+        if value > alpha:
+            alpha = value
+
+    if best_move is not None:
+        if best_value <= alpha_orig:
+            bound = UPPER_BOUND
+        elif best_value >= beta:
+            bound = LOWER_BOUND
+        else:
+            bound = EXACT_BOUND
+        transposition_table[tt_key] = (tt_key, depth, best_value, bound,
+                                       transform_move(best_move, transform) if transform else best_move)
+
+    if on_path and path[ply] is None:
+        path[ply] = best_move
+    return best_move, best_value
+
+
+def quiescence_search(search, ply_board, alpha, beta, depth, cur_ply_player, total_turns_remaining):
+    """
+    Searches only the sumitos of a board at the search horizon, until no more are worth making.
+
+    The player to move can always stand pat, taking the board's evaluation instead of pushing, so that evaluation is
+    a lower bound on the value. Only the pushes that might beat it are searched, push-offs first, and a board that
+    already reaches beta cuts off without searching any.
+
+    Parameters:
+        search, ply_board, alpha, beta, cur_ply_player, total_turns_remaining: as in negamax_search
+        depth: how many more plies of sumitos to follow before the board is taken as quiet
+
+    Returns:
+        best_value: the value of ply_board for cur_ply_player
+    """
+    marble_counts = search.marble_counts
+    best_value = evaluate(search, ply_board, cur_ply_player, total_turns_remaining)
+    if depth == 0 or total_turns_remaining == 0 or marble_counts[cur_ply_player] == 8 or best_value >= beta:
+        return best_value
+    if best_value > alpha:
+        alpha = best_value
+
+    enemy = 1 - cur_ply_player
+    push_off_moves, push_moves = genall_push_moves(ply_board, cur_ply_player)
+    for move in chain(push_off_moves, push_moves):
+        push_off = move >> MOVE_KIND_SHIFT & 0x3 == PUSH_OFF_MOVE
+        if push_off:
+            marble_counts[enemy] -= 1
+        undo_record = make_move(ply_board, decode_move(move))
+        try:
+            # ply_board itself was already counted by the node that called this
+            search.nodes += 1
+            if search.nodes >= search.next_check:
+                search.check_stop()
+            value = -quiescence_search(search, ply_board, -beta, -alpha, depth - 1, enemy, total_turns_remaining - 1)
+        finally:
+            unmake_move(ply_board, undo_record)
+            if push_off:
+                marble_counts[enemy] += 1
+
+        if value > best_value:
+            best_value = value
+        if value >= beta:
+            break
+        if value > alpha:
+            alpha = value
+
+    return best_value
+
+
+def evaluate(search, ply_board, cur_ply_player, total_turns_remaining):
+    """The eval_callback value of ply_board, for cur_ply_player."""
+    value = search.eval_callback(init_board=search.init_board, ply_board=ply_board,
+                                 total_turns_remaining=total_turns_remaining, max_player=search.max_player,
+                                 time_limit=search.time_limit)
+    return value if cur_ply_player == search.max_player else -value
 
-    def join(self, *args):
-        threading.Thread.join(self, *args)
-        return self._return
 
 def careful_alpha_beta_search_transposition(end_of_time_flag, init_board, ply_board, alpha, beta, total_depth, depth, max_player, cur_ply_player, time_limit,
-                                    total_turns_remaining, eval_callback, transposition_table, path = None):
+                                    total_turns_remaining, eval_callback, transposition_table, path = None, board_hash = None,
+                                    symmetric = False, pvs = False, quiescence = False, null_move = False,
+                                    lmr = False):
     """
-    Determines which function should be called as the starting point of the alpha-beta search, based on the
-    player value.
+    Runs the alpha-beta search from ply_board, stopping as soon as end_of_time_flag is set.
 
     Parameters:
+        end_of_time_flag: a threading.Event, checked every STOP_CHECK_INTERVAL nodes
         board: a dict representation of the marbles on the board
         depth: the current depth limit for the search (ie. how many levels deep before the state is evaluated)
         time_limit: the total allotted time for this move to be determined. Should be accurate to 1/100ths of a second
         max_player: a value, 0(black) or 1(white), indicating whose turn it is in the game
         cur_ply_player: a value, 0(black) or 1(white), indicating whose turn it is in the current ply
         turns_remaining: the total remaining turns for the current player
+        board_hash: the zobrist_hash of ply_board with cur_ply_player to move. Computed if not given, then kept up
+            to date incrementally for each child
+        symmetric: if True, board_hash is the tuple of symmetric_hashes of ply_board instead, and the transposition
+            table is keyed by canonical hash so symmetric positions share entries. Only for symmetric heuristics
+        pvs: if True, runs a principal variation search, see SearchContext
+        quiescence: if True, searches sumitos past depth until the board is quiet, see quiescence_search
+        null_move: if True, prunes with null moves, see SearchContext
+        lmr: if True, reduces late quiet moves, see SearchContext
 
     Returns:
-        (best_move, best_move_index, best_value): A tuple containing the best move for a player and that move's value as determined
-        by the evaluation function
+        (best_move, path_move, best_value): A tuple containing the best move for a player (also the move recorded
+        in the principal path) and that move's value as determined
+        by the evaluation function. All None if the search was stopped
     """
-
-    if depth == 0 or total_turns_remaining == 0 or num_player_marbles(cur_ply_player, ply_board) == 8:
-        board_hash = hash_board_state(ply_board)
-        if transposition_table.get(board_hash) is None:
-            transposition_table[board_hash] = eval_callback(init_board=init_board, ply_board=ply_board,
-                                                            total_turns_remaining=total_turns_remaining,
-                                                            max_player=max_player,
-                                                            time_limit=time_limit)
-        return None, None, transposition_table[board_hash]
-
-    best_move = None
-    best_move_index = None
-    best_gm_rb = None
-    continue_search = True
-    x = genall_groupmove_resultboard(ply_board, cur_ply_player)
-    groupmove_resultboard = sorted(x, key=lambda item: len(item[0][0]), reverse=True)
-    if path is not None:
-        try:
-            best_gm_rb = groupmove_resultboard[path[total_depth - depth]]
-            # del groupmove_resultboard[path[total_depth - depth]]
-        except Exception:
-            try:
-                path[total_depth - depth]
-            except Exception:
-                path.append(None)
-
-    if cur_ply_player == max_player:
-        best_value = float('-inf')
-        if best_gm_rb:
-
-            if end_of_time_flag.is_set():
-                return None, None, None
-
-            _, _, value = careful_alpha_beta_search_transposition(end_of_time_flag, init_board, best_gm_rb[1], alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table, path)
-
-            if value is None:
-                return None, None, None
-
-            if value > best_value:
-                best_value = value
-                best_move = best_gm_rb[0]
-                best_move_index = path[total_depth - depth]
-            if value >= beta:
-                continue_search = False
-            if value > alpha:
-                alpha = value
-        if continue_search is True:
-            for i, (move, result_board) in enumerate(groupmove_resultboard):
-                if end_of_time_flag.is_set():
-                    return None, None, None
-                _, _, value = careful_alpha_beta_search_transposition(end_of_time_flag, init_board, result_board, alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table)
-                if value is None:
-                    return None, None, None
-                if value > best_value:
-                    best_value = value
-                    best_move = move
-                    best_move_index = i
-                if value >= beta:
-                    break
-                if value > alpha:
-                    alpha = value
-    else:
-        best_value = float('inf')
-        if best_gm_rb:
-            if end_of_time_flag.is_set():
-                return None, None, None
-            _, _, value = careful_alpha_beta_search_transposition(end_of_time_flag, init_board, best_gm_rb[1], alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table, path)
-            if value is None:
-                return None, None, None
-            if value < best_value:
-                best_value = value
-                best_move = best_gm_rb[0]
-                best_move_index = path[total_depth - depth]
-            if value <= alpha:
-                continue_search = False
-            if value < beta:
-                beta = value
-        if continue_search is True:
-            for i, (move, result_board) in enumerate(groupmove_resultboard):
-                if end_of_time_flag.is_set():
-                    return None, None, None
-                _, _, value = careful_alpha_beta_search_transposition(end_of_time_flag, init_board, result_board, alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table)
-                if value is None:
-                    return None, None, None
-                if value < best_value:
-                    best_value = value
-                    best_move = move
-                    best_move_index = i
-                if value <= alpha:
-                    break
-                if value < beta:
-                    beta = value
-
-    if path and path[total_depth - depth] is None:
-        path[total_depth - depth] = best_move_index
-    return best_move, best_move_index, best_value
+    search = SearchContext(init_board, max_player, time_limit, eval_callback, transposition_table, total_depth,
+                           path=path, should_stop=end_of_time_flag.is_set, symmetric=symmetric, pvs=pvs,
+                           quiescence=quiescence, null_move=null_move, lmr=lmr)
+    return run_search(search, ply_board, alpha, beta, depth, cur_ply_player, total_turns_remaining, board_hash)
 
 def reckless_alpha_beta_search_transposition(init_board, ply_board, alpha, beta, total_depth, depth, max_player, cur_ply_player, time_limit,
-                                    total_turns_remaining, eval_callback, transposition_table, path = None):
+                                    total_turns_remaining, eval_callback, transposition_table, path = None, board_hash = None,
+                                    symmetric = False, pvs = False, quiescence = False, null_move = False,
+                                    lmr = False):
     """
-    Determines which function should be called as the starting point of the alpha-beta search, based on the
-    player value.
+    Runs the alpha-beta search from ply_board to the full depth, without ever stopping early.
 
     Parameters:
         board: a dict representation of the marbles on the board
@@ -466,165 +892,31 @@ def reckless_alpha_beta_search_transposition(init_board, ply_board, alpha, beta,
         max_player: a value, 0(black) or 1(white), indicating whose turn it is in the game
         cur_ply_player: a value, 0(black) or 1(white), indicating whose turn it is in the current ply
         turns_remaining: the total remaining turns for the current player
+        board_hash: the zobrist_hash of ply_board with cur_ply_player to move. Computed if not given, then kept up
+            to date incrementally for each child
+        symmetric: if True, board_hash is the tuple of symmetric_hashes of ply_board instead, and the transposition
+            table is keyed by canonical hash so symmetric positions share entries. Only for symmetric heuristics
+        pvs: if True, runs a principal variation search, see SearchContext
+        quiescence: if True, searches sumitos past depth until the board is quiet, see quiescence_search
+        null_move: if True, prunes with null moves, see SearchContext
+        lmr: if True, reduces late quiet moves, see SearchContext
 
     Returns:
-        (best_move, best_move_index, best_value): A tuple containing the best move for a player and that move's value as determined
+        (best_move, path_move, best_value): A tuple containing the best move for a player (also the move recorded
+        in the principal path) and that move's value as determined
         by the evaluation function
     """
-
-    if depth == 0 or total_turns_remaining == 0 or num_player_marbles(cur_ply_player, ply_board) == 8:
-        board_hash = hash_board_state(ply_board)
-        if transposition_table.get(board_hash) is None:
-            transposition_table[board_hash] = eval_callback(init_board=init_board, ply_board=ply_board,
-                                                            total_turns_remaining=total_turns_remaining,
-                                                            max_player=max_player,
-                                                            time_limit=time_limit)
-        return None, None, transposition_table[board_hash]
-
-    best_move = None
-    best_move_index = None
-    best_gm_rb = None
-    continue_search = True
-    x = genall_groupmove_resultboard(ply_board, cur_ply_player)
-    groupmove_resultboard = sorted(x, key=lambda item: len(item[0][0]), reverse=True)
-    if path is not None:
-        try:
-            best_gm_rb = groupmove_resultboard[path[total_depth - depth]]
-            # del groupmove_resultboard[path[total_depth - depth]]
-        except Exception:
-            try:
-                path[total_depth - depth]
-            except Exception:
-                path.append(None)
-
-    if cur_ply_player == max_player:
-        best_value = float('-inf')
-        if best_gm_rb:
-            _, _, value = reckless_alpha_beta_search_transposition(init_board, best_gm_rb[1], alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table, path)
-            if value > best_value:
-                best_value = value
-                best_move = best_gm_rb[0]
-                best_move_index = path[total_depth - depth]
-            if value >= beta:
-                continue_search = False
-            if value > alpha:
-                alpha = value
-        if continue_search is True:
-            for i, (move, result_board) in enumerate(groupmove_resultboard):
-                _, _, value = reckless_alpha_beta_search_transposition(init_board, result_board, alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table)
-                if value > best_value:
-                    best_value = value
-                    best_move = move
-                    best_move_index = i
-                if value >= beta:
-                    break
-                if value > alpha:
-                    alpha = value
-    else:
-        best_value = float('inf')
-        if best_gm_rb:
-            _, _, value = reckless_alpha_beta_search_transposition(init_board, best_gm_rb[1], alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table, path)
-            if value < best_value:
-                best_value = value
-                best_move = best_gm_rb[0]
-                best_move_index = path[total_depth - depth]
-            if value <= alpha:
-                continue_search = False
-            if value < beta:
-                beta = value
-        if continue_search is True:
-            for i, (move, result_board) in enumerate(groupmove_resultboard):
-                _, _, value = reckless_alpha_beta_search_transposition(init_board, result_board, alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table)
-                if value < best_value:
-                    best_value = value
-                    best_move = move
-                    best_move_index = i
-                if value <= alpha:
-                    break
-                if value < beta:
-                    beta = value
-
-    if path and path[total_depth - depth] is None:
-        path[total_depth - depth] = best_move_index
-    return best_move, best_move_index, best_value
+    search = SearchContext(init_board, max_player, time_limit, eval_callback, transposition_table, total_depth,
+                           path=path, symmetric=symmetric, pvs=pvs,
+                           quiescence=quiescence, null_move=null_move, lmr=lmr)
+    return run_search(search, ply_board, alpha, beta, depth, cur_ply_player, total_turns_remaining, board_hash)
 
 
 def alpha_beta_search_control(init_board, ply_board, alpha, beta, total_depth, depth, max_player, cur_ply_player, time_limit,
-                              total_turns_remaining, eval_callback, transposition_table, path = None):
-    if depth == 0 or total_turns_remaining == 0 or num_player_marbles(cur_ply_player, ply_board) == 8:
-        board_hash = hash_board_state(ply_board)
-        if transposition_table.get(board_hash) is None:
-            transposition_table[board_hash] = eval_callback(init_board=init_board, ply_board=ply_board,
-                                                            total_turns_remaining=total_turns_remaining,
-                                                            max_player=max_player,
-                                                            time_limit=time_limit)
-        return None, None, transposition_table[board_hash]
-
-    best_move = None
-    best_move_index = None
-    best_gm_rb = None
-    continue_search = True
-    groupmove_resultboard = genall_groupmove_resultboard(ply_board, cur_ply_player)
-    if path is not None:
-        try:
-            best_gm_rb = groupmove_resultboard[path[total_depth - depth]]
-            del groupmove_resultboard[path[total_depth - depth]]
-        except Exception:
-            try:
-                path[total_depth - depth]
-            except Exception:
-                path.append(None)
-
-    if cur_ply_player == max_player:
-        best_value = float('-inf')
-        if best_gm_rb:
-            _, _, value = alpha_beta_search_control(init_board, best_gm_rb[1], alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table, path)
-            if value > best_value:
-                best_value = value
-                best_move = best_gm_rb[0]
-                best_move_index = path[total_depth - depth]
-            if value >= beta:
-                continue_search = False
-            if value > alpha:
-                alpha = value
-        if continue_search is True:
-            for i, (move, result_board) in enumerate(groupmove_resultboard):
-                _, _, value = alpha_beta_search_control(init_board,result_board, alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table)
-                if value > best_value:
-                    best_value = value
-                    best_move = move
-                    best_move_index = i
-                if value >= beta:
-                    break
-                if value > alpha:
-                    alpha = value
-    else:
-        best_value = float('inf')
-        if best_gm_rb:
-            _, _, value = alpha_beta_search_control(init_board, best_gm_rb[1], alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table, path)
-            if value < best_value:
-                best_value = value
-                best_move = best_gm_rb[0]
-                best_move_index = path[total_depth - depth]
-            if value <= alpha:
-                continue_search = False
-            if value < beta:
-                beta = value
-        if continue_search is True:
-            for i, (move, result_board) in enumerate(groupmove_resultboard):
-                _, _, value = alpha_beta_search_control(init_board,result_board, alpha, beta, total_depth, depth - 1, max_player, 1 - cur_ply_player, time_limit, total_turns_remaining - 1, eval_callback, transposition_table)
-                if value < best_value:
-                    best_value = value
-                    best_move = move
-                    best_move_index = i
-                if value <= alpha:
-                    break
-                if value < beta:
-                    beta = value
-
-    if path and path[total_depth - depth] is None:
-        path[total_depth - depth] = best_move_index
-    return best_move, best_move_index, best_value
+                              total_turns_remaining, eval_callback, transposition_table, path = None, board_hash = None):
+    search = SearchContext(init_board, max_player, time_limit, eval_callback, transposition_table, total_depth,
+                           path=path, order=GENERATED_ORDER)
+    return run_search(search, ply_board, alpha, beta, depth, cur_ply_player, total_turns_remaining, board_hash)
 
 
 def hash_marble_position(position, player):
@@ -0,0 +1,174 @@
+"""This module contains a transposition table in shared memory.
+
+Search processes that each build a private table repeat each other's work.
+This table lives in a multiprocessing.shared_memory segment instead, so any
+number of processes read and write the same entries, and pickling the
+table only sends the name of its segment.
+
+There are no locks. Two processes writing one slot at once can leave a
+mix of both writes behind, so every slot also stores its key XORed with
+its other words, and a probe only trusts a slot whose words XOR back to
+the key it is looking for. A torn slot just reads as a miss.
+
+Informal Definition, and Conventions:
+
+    SEGMENT LAYOUT:
+        uint64 words, the header first:
+
+            word 0      number of slots
+            word 1      the current generation
+
+        then three arrays of one word per slot:
+
+            checks      key ^ value_bits ^ data
+            values      the entry's value as a float64
+            datas       the rest of the entry packed into one word, 0 if
+                        the slot is unused
+
+    DATA WORD:
+            bits  0-31  encoded move, or NO_MOVE
+            bits 32-39  depth + 1, so a used slot is never 0
+            bits 40-47  bound
+            bits 48-55  generation
+
+    BUCKETS:
+        same two slot buckets and replacement policy as TranspositionTable.
+"""
+from multiprocessing import shared_memory
+
+import numpy as np
+
+from .movecodes import NO_MOVE
+from .transposition import DEFAULT_TT_SIZE_MB
+
+HEADER_WORDS = 2
+
+# words per slot: check, value and data
+SLOT_WORDS = 3
+
+DATA_DEPTH_SHIFT = 32
+DATA_BOUND_SHIFT = 40
+DATA_GENERATION_SHIFT = 48
+
+
+def pack_data(depth: int, bound: int, move: int | None,
+              generation: int) -> int:
+    """Packs the non-value fields of an entry into a data word."""
+    return ((move if move is not None else NO_MOVE)
+            | (depth + 1) << DATA_DEPTH_SHIFT
+            | bound << DATA_BOUND_SHIFT
+            | generation << DATA_GENERATION_SHIFT)
+
+
+class SharedTranspositionTable:
+    """
+    A lockless transposition table in a multiprocessing.shared_memory segment.
+
+    Made with a size, it creates a new segment. Made with the name of an
+    existing segment, it attaches to it. The process that created the
+    segment should unlink() it once every process is done with it.
+    """
+
+    def __init__(self, size_mb=DEFAULT_TT_SIZE_MB, name=None):
+        if name is None:
+            num_buckets = 1
+            while num_buckets * 4 * SLOT_WORDS * 8 <= size_mb * 1024 * 1024:
+                num_buckets *= 2
+            num_slots = num_buckets * 2
+            self.shm = shared_memory.SharedMemory(
+                create=True, size=(HEADER_WORDS + num_slots * SLOT_WORDS) * 8)
+            words = np.ndarray(HEADER_WORDS + num_slots * SLOT_WORDS,
+                               dtype=np.uint64, buffer=self.shm.buf)
+            words[:] = 0
+            words[0] = num_slots
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+            num_slots = int(np.ndarray(1, dtype=np.uint64,
+                                       buffer=self.shm.buf)[0])
+            words = np.ndarray(HEADER_WORDS + num_slots * SLOT_WORDS,
+                               dtype=np.uint64, buffer=self.shm.buf)
+
+        self.mask = num_slots // 2 - 1
+        self.header = words[:HEADER_WORDS]
+        self.checks = words[HEADER_WORDS:HEADER_WORDS + num_slots]
+        self.value_bits = words[HEADER_WORDS + num_slots:
+                                HEADER_WORDS + 2 * num_slots]
+        self.values = self.value_bits.view(np.float64)
+        self.datas = words[HEADER_WORDS + 2 * num_slots:]
+
+    @property
+    def name(self):
+        return self.shm.name
+
+    def __getstate__(self):
+        return {'name': self.name}
+
+    def __setstate__(self, state):
+        self.__init__(name=state['name'])
+
+    def __len__(self):
+        return int(np.count_nonzero(self.datas))
+
+    def _read(self, index, key):
+        """Reads the entry in a slot, or None if it is unused, torn or for
+        another key."""
+        data = int(self.datas[index])
+        if not data:
+            return None
+        value_bits = self.value_bits[index]
+        if int(self.checks[index]) ^ int(value_bits) ^ data != key:
+            return None
+        move = data & 0xFFFFFFFF
+        return (key, (data >> DATA_DEPTH_SHIFT & 0xFF) - 1,
+                float(value_bits.view(np.float64)),
+                data >> DATA_BOUND_SHIFT & 0xFF,
+                move if move != NO_MOVE else None)
+
+    def get(self, key, default=None):
+        """Gets the entry stored for key, or default."""
+        index = (key & self.mask) << 1
+        entry = self._read(index, key)
+        if entry is None:
+            entry = self._read(index + 1, key)
+        return entry if entry is not None else default
+
+    def __setitem__(self, key, entry):
+        """Stores entry for key, evicting by the replacement policy."""
+        index = (key & self.mask) << 1
+        generation = int(self.header[1])
+        _, depth, value, bound, move = entry
+
+        if self._read(index, key) is None:
+            data = int(self.datas[index])
+            if data and data >> DATA_GENERATION_SHIFT == generation \
+                    and (data >> DATA_DEPTH_SHIFT & 0xFF) - 1 > depth:
+                index += 1
+        if not index & 1 and self._read(index + 1, key) is not None:
+            # the same key must not be left behind in the second slot
+            self.datas[index + 1] = 0
+
+        # the check word is built from this write only, reading the value
+        # back could pick up another process's write to the slot
+        value_bits = int(np.float64(value).view(np.uint64))
+        data = pack_data(depth, bound, move, generation)
+        self.values[index] = value
+        self.datas[index] = data
+        self.checks[index] = key ^ value_bits ^ data
+
+    def new_search(self):
+        """Starts a new generation for every process sharing the table."""
+        self.header[1] = (int(self.header[1]) + 1) & 0xFF
+
+    def clear(self):
+        """Removes every entry."""
+        self.datas[:] = 0
+
+    def close(self):
+        """Detaches this process from the segment."""
+        self.header = self.checks = self.value_bits = self.values = None
+        self.datas = None
+        self.shm.close()
+
+    def unlink(self):
+        """Frees the segment. Only the creating process should call this."""
+        self.shm.unlink()
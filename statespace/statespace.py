@@ -100,8 +100,44 @@ from .marblecoords import is_out_of_bounds
 
 absolute_directions = [10, 11, 1]
 
+# orders genall_groupmoves_iter can yield groupmoves in
+GENERATED_ORDER = "generated"
+LARGEST_FIRST_ORDER = "largest_first"
+
 VALID_COORDS = {11, 12, 13, 14, 15, 21, 22, 23, 24, 25, 26, 31, 32, 33, 34, 35, 36, 37, 41, 42, 43, 44, 45, 46, 47, 48, 51, 52, 53, 54, 55, 56, 57, 58, 59, 62, 63, 64, 65, 66, 67, 68, 69, 73, 74, 75, 76, 77, 78, 79, 84, 85, 86, 87, 88, 89, 95, 96, 97, 98, 99}
 
+all_directions = absolute_directions + [-direction
+                                        for direction in absolute_directions]
+
+
+def _build_rays() -> dict[int, dict[int, tuple[int, ...]]]:
+    """Maps coord -> direction -> the on-board coords along that ray.
+
+    A ray holds at most 5 coords: a 3 marble group pushing 2 enemies only
+    needs to look 5 cells past its tail.
+    """
+    rays = {}
+    for coord in VALID_COORDS:
+        rays[coord] = {}
+        for direction in all_directions:
+            ray = []
+            next_coord = coord + direction
+            while next_coord in VALID_COORDS and len(ray) < 5:
+                ray.append(next_coord)
+                next_coord += direction
+            rays[coord][direction] = tuple(ray)
+    return rays
+
+
+# RAYS[coord][direction] = (coord + direction, coord + 2*direction, ...)
+# stopping at the edge of the board
+RAYS = _build_rays()
+
+# NEIGHBOURS[coord][direction] = coord + direction, or None if off the board
+NEIGHBOURS = {coord: {direction: ray[0] if ray else None
+                      for direction, ray in coord_rays.items()}
+              for coord, coord_rays in RAYS.items()}
+
 def genall_groupmove_resultboard(marbles: dict[int, int],
                                  player_color: int) \
         -> list[tuple[tuple[tuple[tuple[int, int], ...], int], dict[int, int]]]:
@@ -141,6 +177,86 @@ def genall_groupmove_resultboard(marbles: dict[int, int],
     return groupmove_resultboards
 
 
+def genall_player_groupmoves(board: dict[int, int],
+                             player_color: int) \
+        -> list[tuple[tuple[tuple[int, int], ...], int]]:
+    """Generates all groupmoves of player_color without any result boards.
+
+    Moves come in the same order as genall_groupmove_resultboard.
+
+    return format explained:
+        output = list[groupmove]
+    """
+    player_marbles = {coord: color for coord, color in board.items()
+                      if color == player_color}
+    inlinegroupmoves, sidestepgroupmoves = genall_groupmoves(board,
+                                                             player_marbles)
+    return inlinegroupmoves + sidestepgroupmoves
+
+
+def genall_groupmoves_iter(board: dict[int, int],
+                           player_color: int,
+                           order=LARGEST_FIRST_ORDER):
+    """Lazily yields every groupmove of player_color in the given order.
+
+    No result boards are built, and a caller that stops iterating early
+    (ie. on a beta cutoff) skips deriving the moves it never asked for.
+
+    order explained:
+        GENERATED_ORDER: moves are derived and yielded marble by marble,
+            with each group's sidesteps right after its inline moves.
+        LARGEST_FIRST_ORDER: moves with the most marbles come first, in
+            the same order as sorting genall_player_groupmoves by group
+            size. Inline moves are derived up front since they are needed
+            to find groups, but the sidesteps of a group size are only
+            derived once that size is reached.
+        a callable: used as the sort key over all of the groupmoves.
+
+    return format explained:
+        output = iterator[groupmove]
+    """
+    player_marbles = {coord: color for coord, color in board.items()
+                      if color == player_color}
+
+    if order == GENERATED_ORDER:
+        for marble in player_marbles.items():
+            for direction in absolute_directions:
+                inlinegroupmove, sidestepgroupdirs = \
+                    derive_inlinegroupmove_sidestepgroupdirs(board,
+                                                             marble,
+                                                             direction)
+                if inlinegroupmove is not None:
+                    yield inlinegroupmove
+
+                inlinegroupmove = derive_inlinegroupmove(board,
+                                                         marble,
+                                                         -direction)
+                if inlinegroupmove is not None:
+                    yield inlinegroupmove
+
+                yield from derive_sidestepgroupmoves(board, sidestepgroupdirs)
+
+    elif order == LARGEST_FIRST_ORDER:
+        inlinegroupmoves, sidestepgroupdirs = \
+            genall_inlinegroupmoves_sidestepgroupdirs(board, player_marbles)
+
+        # a groupmove has at most 3 player marbles and 2 enemy marbles
+        for group_size in range(5, 0, -1):
+            for groupmove in inlinegroupmoves:
+                if len(groupmove[0]) == group_size:
+                    yield groupmove
+
+            if group_size <= 3:
+                yield from derive_sidestepgroupmoves(
+                    board,
+                    [groupdir for groupdir in sidestepgroupdirs
+                     if len(groupdir[0]) == group_size])
+
+    else:
+        yield from sorted(genall_player_groupmoves(board, player_color),
+                          key=order)
+
+
 def genall_groupmoves(board: dict[int, int],
                       player_marbles: dict[int, int]) \
         -> tuple[list[tuple[tuple[tuple[int], ...], int]],
@@ -186,14 +302,8 @@ def is_valid_sidemove(board: dict[int, int],
                       direction: int) -> bool:
     """True if groupdir being moved in direction is a valid sidemove."""
     for marble in group:
-        new_coord = marble[0] + direction
-        try:
-            board[new_coord]
-            return False
-        except KeyError:
-            pass
-
-        if new_coord not in VALID_COORDS:
+        new_coord = NEIGHBOURS[marble[0]][direction]
+        if new_coord is None or new_coord in board:
             return False
 
     return True
@@ -244,52 +354,42 @@ def derive_inlinegroupmove_sidestepgroupdirs(board: dict[int, int],
         list[tuple[tuple[tuple[int, int], ...], int]]]:
     """Get marble's inline groupmove, sidestep groupdirs, for single direction.
 
+    Walks the precomputed ray from marble, following the rules laid out in
+    docs/state_space_gen_notes.txt.
+
     return format explained:
         output = (inlinegroupmove, list[sidestepgroupdir])
     """
     sidestep_groupdirs = []
+    player_color = marble[1]
     cur_grouping = [marble]
-    next_coord = marble[0] + direction
     num_players = 1
     num_enemies = 0
 
-    next_marble = None
-
-    while True:
-        # if next == AVAILABLE: break
-        try:
-            # throws KeyError if no marble at that coordinate
-            next_marble = (next_coord, board[next_coord])
-        except KeyError:
-            next_marble = None
-            break
-
-        if next_coord not in VALID_COORDS \
-                or num_players == num_enemies \
-                or num_players == 3 and next_marble[1] == marble[1] \
-                or next_marble[1] == marble[1] and cur_grouping[-1][1] == 1 - marble[1]:
-            break
-
-        cur_grouping.append(next_marble)
-
-        if next_marble[1] == marble[1]:
-            sidestep_groupdirs.append((tuple(cur_grouping), direction))
+    for next_coord in RAYS[marble[0]][direction]:
+        next_color = board.get(next_coord)
+        if next_color is None:
+            # next is AVAILABLE, the whole grouping can advance
+            if num_players > num_enemies:
+                return (tuple(cur_grouping), direction), sidestep_groupdirs
+            return None, sidestep_groupdirs
+
+        if next_color == player_color:
+            if num_enemies or num_players == 3:
+                return None, sidestep_groupdirs
             num_players += 1
-        elif next_marble[1] == 1 - marble[1]:
+            cur_grouping.append((next_coord, next_color))
+            sidestep_groupdirs.append((tuple(cur_grouping), direction))
+        else:
             num_enemies += 1
+            if num_enemies >= num_players:
+                return None, sidestep_groupdirs
+            cur_grouping.append((next_coord, next_color))
 
-        next_coord += direction
-
-    if next_coord not in VALID_COORDS and cur_grouping[-1][1] == marble[1]:
-        return None, sidestep_groupdirs
-    elif num_players == 3 and next_marble and next_marble[1] == marble[1]:
-        return None, sidestep_groupdirs
-    elif next_marble and next_marble[1] == marble[1] and cur_grouping[-1][1] == 1 - marble[1]:
-        return None, sidestep_groupdirs
-    elif num_players > num_enemies:
+    # next is OUT OF BOUNDS, only a sumito may push enemies off the board
+    if num_enemies:
         return (tuple(cur_grouping), direction), sidestep_groupdirs
-    else:
-        return None, sidestep_groupdirs
+    return None, sidestep_groupdirs
 
 
 def derive_inlinegroupmove(board: dict[int, int],
@@ -298,49 +398,174 @@ def derive_inlinegroupmove(board: dict[int, int],
         -> tuple[tuple[tuple[int, int], ...], int] | None:
     """Get marble's inline groupmove for single direction.
 
+    Same walk as derive_inlinegroupmove_sidestepgroupdirs, without
+    collecting sidestep groupdirs.
+
     return format explained:
-        output = (inlinegroupmove, list[sidestepgroupdir])
+        output = inlinegroupmove
     """
+    player_color = marble[1]
     cur_grouping = [marble]
-    next_coord = marble[0] + direction
     num_players = 1
     num_enemies = 0
 
-    next_marble = None
-
-    while True:
-        # if next == AVAILABLE: break
-        try:
-            # throws KeyError if no marble at that coordinate
-            next_marble = (next_coord, board[next_coord])
-        except KeyError:
-            next_marble = None
-            break
-        if next_coord not in VALID_COORDS \
-                or num_players == num_enemies \
-                or num_players == 3 and next_marble[1] == marble[1] \
-                or next_marble[1] == marble[1] and cur_grouping[-1][1] == 1 - marble[1]:
-            break
-
-        cur_grouping.append(next_marble)
-
-        if next_marble[1] == marble[1]:
+    for next_coord in RAYS[marble[0]][direction]:
+        next_color = board.get(next_coord)
+        if next_color is None:
+            if num_players > num_enemies:
+                return tuple(cur_grouping), direction
+            return None
+
+        if next_color == player_color:
+            if num_enemies or num_players == 3:
+                return None
             num_players += 1
-        elif next_marble[1] == 1 - marble[1]:
+        else:
             num_enemies += 1
+            if num_enemies >= num_players:
+                return None
+        cur_grouping.append((next_coord, next_color))
 
-        next_coord += direction
-
-    if next_coord not in VALID_COORDS and cur_grouping[-1][1] == marble[1]:
-        return None
-    elif num_players == 3 and next_marble and next_marble[1] == marble[1]:
-        return None
-    elif next_marble and next_marble[1] == marble[1] and cur_grouping[-1][1] == 1 - marble[1]:
-        return None
-    elif num_players > num_enemies:
+    if num_enemies:
         return tuple(cur_grouping), direction
-    else:
-        return None
+    return None
+
+
+def genall_push_groupmoves(board: dict[int, int],
+                           player_color: int) \
+        -> tuple[list[tuple[tuple[tuple[int, int], ...], int]],
+        list[tuple[tuple[tuple[int, int], ...], int]]]:
+    """Generates only the sumitos of player_color, no quiet moves.
+
+    return format explained:
+        output = (list[push_off_groupmove], list[push_groupmove])
+
+        a push_off_groupmove pushes an enemy marble off the board, a
+        push_groupmove keeps every marble on the board
+    """
+    push_off_groupmoves = []
+    push_groupmoves = []
+
+    for marble in board.items():
+        if marble[1] != player_color:
+            continue
+        for direction in all_directions:
+            groupmove = derive_inlinegroupmove(board, marble, direction)
+            # a group ending in a player marble pushes no enemies
+            if groupmove is None or groupmove[0][-1][1] == player_color:
+                continue
+            if groupmove[0][-1][0] + direction in VALID_COORDS:
+                push_groupmoves.append(groupmove)
+            else:
+                push_off_groupmoves.append(groupmove)
+
+    return push_off_groupmoves, push_groupmoves
+
+
+def genall_push_groupmove_resultboard_iter(board: dict[int, int],
+                                           player_color: int):
+    """Lazily yields the sumitos of player_color with their result boards.
+
+    Push offs come before ordinary pushes. A result board is only copied
+    when its groupmove is reached, so a caller that stops early (ie. on a
+    beta cutoff) never builds the rest.
+
+    return format explained:
+        output = iterator[(groupmove, resultant_board)]
+    """
+    push_off_groupmoves, push_groupmoves = genall_push_groupmoves(board,
+                                                                  player_color)
+    for groupmove in push_off_groupmoves + push_groupmoves:
+        resultant_board = board.copy()
+        apply_move(resultant_board, groupmove)
+        yield groupmove, resultant_board
+
+
+def count_moves(board: dict[int, int],
+                player_color: int) -> tuple[int, int, int, int]:
+    """Counts the groupmoves of player_color without generating any.
+
+    return format explained:
+        output = (num_inline, num_sidestep, num_push, num_push_off)
+
+        num_inline counts inline moves that push nothing, num_push counts
+        sumitos that keep every marble on the board and num_push_off
+        counts sumitos that push a marble off. The four sum to
+        len(genall_player_groupmoves(board, player_color)).
+    """
+    counts = [0, 0, 0, 0]
+    for coord, color in board.items():
+        if color == player_color:
+            _count_marble_moves(board, coord, player_color, counts)
+    return tuple(counts)
+
+
+def count_all_moves(board: dict[int, int]) \
+        -> tuple[tuple[int, int, int, int], tuple[int, int, int, int]]:
+    """Counts the groupmoves of both colours in a single pass over board.
+
+    return format explained:
+        output = (black_counts, white_counts)
+
+        black_counts, white_counts = (num_inline, num_sidestep, num_push,
+                                      num_push_off), like count_moves
+    """
+    counts = [[0, 0, 0, 0], [0, 0, 0, 0]]
+    for coord, player_color in board.items():
+        _count_marble_moves(board, coord, player_color, counts[player_color])
+    return tuple(counts[0]), tuple(counts[1])
+
+
+def _count_marble_moves(board: dict[int, int], coord: int, player_color: int,
+                        counts: list[int]) -> None:
+    """Adds the groupmoves with the marble at coord as their tail to counts.
+
+    Walks the same rays as derive_inlinegroupmove and is_valid_sidemove,
+    counting moves instead of building groupmoves. counts is indexed like
+    the output of count_moves.
+    """
+    coord_rays = RAYS[coord]
+
+    for direction in all_directions:
+        num_players = 1
+        num_enemies = 0
+        for next_coord in coord_rays[direction]:
+            next_color = board.get(next_coord)
+            if next_color is None:
+                if num_players > num_enemies:
+                    counts[2 if num_enemies else 0] += 1
+                break
+
+            if next_color == player_color:
+                if num_enemies or num_players == 3:
+                    break
+                num_players += 1
+            else:
+                num_enemies += 1
+                if num_enemies >= num_players:
+                    break
+        else:
+            if num_enemies:
+                counts[3] += 1
+
+    for axis in absolute_directions:
+        members = [coord]
+        for next_coord in coord_rays[axis][:2]:
+            if board.get(next_coord) != player_color:
+                break
+            members.append(next_coord)
+
+            # every group of 2 or 3 along axis from coord sidesteps in
+            # the 4 directions off that axis
+            for direction in all_directions:
+                if direction == axis or direction == -axis:
+                    continue
+                for member in members:
+                    new_coord = NEIGHBOURS[member][direction]
+                    if new_coord is None or new_coord in board:
+                        break
+                else:
+                    counts[1] += 1
 
 
 def apply_move(board, groupmove):
@@ -353,6 +578,30 @@ def apply_move(board, groupmove):
         board[marble[0] + groupmove[1]] = marble[1]
 
 
+def make_move(board: dict[int, int],
+              groupmove: tuple[tuple[tuple[int, int], ...], int]) \
+        -> tuple[tuple[tuple[int, int], ...], int]:
+    """Apply the given move to the board in place and return its undo record.
+
+    A groupmove already holds the colour of every marble it moves or pushes
+    off, so the undo record is the groupmove itself.
+    """
+    apply_move(board, groupmove)
+    return groupmove
+
+
+def unmake_move(board: dict[int, int],
+                undo_record: tuple[tuple[tuple[int, int], ...], int]) -> None:
+    """Revert the move that make_move returned undo_record for."""
+    group, direction = undo_record
+    for marble in group:
+        new_coord = marble[0] + direction
+        if new_coord in VALID_COORDS:
+            del board[new_coord]
+    for marble in group:
+        board[marble[0]] = marble[1]
+
+
 if __name__ == "__main__":
     # def f8_alt(x):
     #     return "%14.9f" % x
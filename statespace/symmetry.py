@@ -0,0 +1,158 @@
+"""This module contains the symmetries of the board and canonical hashing.
+
+The hexagonal board looks the same after any of 6 rotations about E5,
+each with or without a mirror, 12 symmetries in all. Positions that are
+symmetric to each other have the same value and mirrored best moves, so
+tables keyed by a canonical hash can share one entry between all of them.
+
+Only some heuristics are symmetric (a heuristic that sums raw coords is
+not), so everything here is opt-in.
+
+Informal Definition, and Conventions:
+
+    TRANSFORM:
+        an int from 0 to 11 indexing TRANSFORMS. Transform k + 6*m mirrors
+        the board if m is 1, then rotates it by k * 60 degrees. Transform
+        0 is the identity.
+
+        TRANSFORMS[transform] maps every valid coord to its new coord and
+        DIRECTION_TRANSFORMS[transform] maps every direction delta to its
+        new delta.
+
+    ROTATING AND MIRRORING:
+        with x = column - 5 and y = row - 5, E5 sits at (0, 0) and the six
+        directions are (1,0), (1,1), (0,1), (-1,0), (-1,-1), (0,-1) in
+        counterclockwise order. Rotating by 60 degrees takes (x, y) to
+        (x - y, x), and mirroring across the 11 <--> -11 axis swaps x and y.
+
+    CANONICAL HASH:
+        the smallest zobrist_hash among the 12 transformed boards, paired
+        with the transform that produced it. A best move stored against a
+        canonical hash is stored in the canonical board's frame, and is
+        mapped back with the inverse transform.
+"""
+from .movecodes import decode_move, encode_move
+from .statespace import VALID_COORDS, all_directions
+from .zobrist import SIDE_TO_MOVE_KEY, hashed_positions, zobrist_move_delta
+
+CENTRE = 55
+
+NUM_TRANSFORMS = 12
+
+
+def _transform_coord(coord: int, transform: int) -> int:
+    """Maps a coord through a transform, worked out from first principles."""
+    x = coord % 10 - CENTRE % 10
+    y = coord // 10 - CENTRE // 10
+    if transform >= 6:
+        x, y = y, x
+    for _ in range(transform % 6):
+        x, y = x - y, x
+    return CENTRE + y * 10 + x
+
+
+TRANSFORMS = [{coord: _transform_coord(coord, transform)
+               for coord in VALID_COORDS}
+              for transform in range(NUM_TRANSFORMS)]
+
+DIRECTION_TRANSFORMS = [{direction: _transform_coord(CENTRE + direction,
+                                                     transform) - CENTRE
+                         for direction in all_directions}
+                        for transform in range(NUM_TRANSFORMS)]
+
+INVERSE_TRANSFORMS = [next(inverse for inverse in range(NUM_TRANSFORMS)
+                           if all(TRANSFORMS[inverse][TRANSFORMS[transform]
+                                                     [coord]] == coord
+                                  for coord in VALID_COORDS))
+                      for transform in range(NUM_TRANSFORMS)]
+
+# SYMMETRIC_KEYS[transform][marble] is the zobrist key of that marble once
+# transformed, so a transformed board can be hashed without building it
+SYMMETRIC_KEYS = [{(coord, color): hashed_positions[(new_coord, color)]
+                   for coord, new_coord in coord_map.items()
+                   for color in (0, 1)}
+                  for coord_map in TRANSFORMS]
+
+# encoded move -> tuple of its zobrist_move_delta under every transform
+_symmetric_move_deltas = {}
+
+
+def transform_board(board: dict[int, int], transform: int) -> dict[int, int]:
+    """Returns a copy of board with every marble moved through transform."""
+    coord_map = TRANSFORMS[transform]
+    return {coord_map[coord]: color for coord, color in board.items()}
+
+
+def transform_groupmove(groupmove: tuple[tuple[tuple[int, int], ...], int],
+                        transform: int) \
+        -> tuple[tuple[tuple[int, int], ...], int]:
+    """Returns groupmove as it would be played on the transformed board."""
+    coord_map = TRANSFORMS[transform]
+    group, direction = groupmove
+    return (tuple((coord_map[coord], color) for coord, color in group),
+            DIRECTION_TRANSFORMS[transform][direction])
+
+
+def transform_move(move: int, transform: int) -> int:
+    """Returns an encoded move as it would be played on the transformed board."""
+    return encode_move(transform_groupmove(decode_move(move), transform))
+
+
+def symmetric_hashes(board: dict[int, int], player: int) -> tuple[int, ...]:
+    """zobrist_hash of board under each of the 12 transforms, in order."""
+    side_key = SIDE_TO_MOVE_KEY if player == 1 else 0
+    hashes = []
+    for keys in SYMMETRIC_KEYS:
+        hashed_board = side_key
+        for marble in board.items():
+            hashed_board ^= keys[marble]
+        hashes.append(hashed_board)
+    return tuple(hashes)
+
+
+def canonical_hash(board: dict[int, int], player: int) -> tuple[int, int]:
+    """Canonical hash of board with player to move.
+
+    return format explained:
+        output = (canonical_hash, transform)
+
+        transform takes board to the canonical board.
+    """
+    hashes = symmetric_hashes(board, player)
+    canonical = min(hashes)
+    return canonical, hashes.index(canonical)
+
+
+def canonical_board(board: dict[int, int], player: int) \
+        -> tuple[dict[int, int], int]:
+    """Minimal symmetric representative of board, and the transform to it.
+
+    return format explained:
+        output = (canonical_board, transform)
+    """
+    _, transform = canonical_hash(board, player)
+    return transform_board(board, transform), transform
+
+
+def symmetric_move_deltas(move: int) -> tuple[int, ...]:
+    """zobrist_move_delta of an encoded move under each transform, cached.
+
+    XORing these onto the symmetric_hashes of a board, one for one, gives
+    the symmetric_hashes of the board after the move.
+    """
+    deltas = _symmetric_move_deltas.get(move)
+    if deltas is None:
+        groupmove = decode_move(move)
+        deltas = tuple(zobrist_move_delta(transform_groupmove(groupmove,
+                                                              transform))
+                       for transform in range(NUM_TRANSFORMS))
+        _symmetric_move_deltas[move] = deltas
+    return deltas
+
+
+def symmetric_child_hashes(hashes: tuple[int, ...],
+                           move: int) -> tuple[int, ...]:
+    """symmetric_hashes of the board reached by playing move."""
+    return tuple(board_hash ^ delta
+                 for board_hash, delta in zip(hashes,
+                                              symmetric_move_deltas(move)))
@@ -0,0 +1,142 @@
+"""This module contains the format of transposition table entries.
+
+Informal Definition, and Conventions:
+
+    TRANSPOSITION TABLE:
+        anything with get(key) and table[key] = entry, a plain dict being
+        the simplest. key is the zobrist hash of a board with the player to
+        move, or its canonical hash in symmetric searches.
+
+    ENTRY:
+        a tuple describing what a search already knows about a board:
+            (<key>, <depth>, <value>, <bound>, <best_move>)
+
+        key: the full hash again, so tables that index by only some of its
+            bits can verify the entry really is for this board
+        depth: how many plies were searched below the board. Leaves that
+            were only evaluated have depth 0
+        value: the value of the board for the player to move
+        bound: how value relates to the board's true value, see BOUNDS
+        best_move: the encoded move that was best, or caused the cutoff, or
+            None for leaves
+
+        example:
+            (2251738777944622381, 3, 0.27, EXACT_BOUND, 188465)
+
+    BOUNDS:
+        EXACT_BOUND: value is the true value at that depth
+        LOWER_BOUND: the search failed high, the true value is at least
+            value
+        UPPER_BOUND: the search failed low, the true value is at most value
+"""
+EXACT_BOUND = 0
+LOWER_BOUND = 1
+UPPER_BOUND = 2
+
+ENTRY_KEY = 0
+ENTRY_DEPTH = 1
+ENTRY_VALUE = 2
+ENTRY_BOUND = 3
+ENTRY_MOVE = 4
+
+# rough size of one slot of a TranspositionTable: the list pointer, the
+# entry tuple and the ints and float inside it
+ENTRY_BYTES = 192
+
+DEFAULT_TT_SIZE_MB = 64
+
+
+class TranspositionTable:
+    """
+    A transposition table that never grows past a fixed memory budget.
+
+    The table is an array of buckets of two slots, indexed by the low bits
+    of the key. The first slot of a bucket prefers deep entries, and only
+    gives way to an entry searched at least as deep, an entry for the same
+    key, or any entry once its own is stale. Everything else goes into the
+    second slot, which is always replaced.
+
+    Every entry is stamped with the generation it was stored in, and
+    new_search() starts a new generation. Entries left over from the
+    searches of earlier moves are stale, so they are the first to be
+    evicted, however deep they were.
+    """
+
+    def __init__(self, size_mb=DEFAULT_TT_SIZE_MB):
+        num_buckets = 1
+        while num_buckets * 4 * ENTRY_BYTES <= size_mb * 1024 * 1024:
+            num_buckets *= 2
+
+        self.mask = num_buckets - 1
+        self.slots = [None] * (num_buckets * 2)
+        self.generations = bytearray(num_buckets * 2)
+        self.generation = 0
+        self.num_entries = 0
+
+    def __len__(self):
+        return self.num_entries
+
+    def get(self, key, default=None):
+        """Gets the entry stored for key, or default."""
+        index = (key & self.mask) << 1
+        entry = self.slots[index]
+        if entry is not None and entry[ENTRY_KEY] == key:
+            return entry
+        entry = self.slots[index + 1]
+        if entry is not None and entry[ENTRY_KEY] == key:
+            return entry
+        return default
+
+    def __setitem__(self, key, entry):
+        """Stores entry for key, evicting by the replacement policy."""
+        index = (key & self.mask) << 1
+        slots = self.slots
+        deep_entry = slots[index]
+
+        if deep_entry is None:
+            self.num_entries += 1
+        elif deep_entry[ENTRY_KEY] != key \
+                and self.generations[index] == self.generation \
+                and deep_entry[ENTRY_DEPTH] > entry[ENTRY_DEPTH]:
+            index += 1
+            other_entry = slots[index]
+            if other_entry is None:
+                self.num_entries += 1
+        else:
+            # the same key must not be left behind in the second slot
+            other_entry = slots[index + 1]
+            if other_entry is not None and other_entry[ENTRY_KEY] == key:
+                slots[index + 1] = None
+                self.num_entries -= 1
+
+        slots[index] = entry
+        self.generations[index] = self.generation
+
+    def new_search(self):
+        """Starts a new generation, making every entry stored so far stale."""
+        self.generation = (self.generation + 1) & 0xFF
+
+    def clear(self):
+        """Removes every entry."""
+        self.slots = [None] * len(self.slots)
+        self.generations = bytearray(len(self.slots))
+        self.num_entries = 0
+
+
+def make_transposition_table(size_mb=DEFAULT_TT_SIZE_MB, num_workers=1):
+    """A TranspositionTable, or a SharedTranspositionTable if num_workers
+    processes will search with it at once."""
+    if num_workers > 1:
+        # imported here since only parallel searches need NumPy
+        from .shared_transposition import SharedTranspositionTable
+        return SharedTranspositionTable(size_mb)
+    return TranspositionTable(size_mb)
+
+
+def free_transposition_table(table):
+    """Frees the shared memory of a table from make_transposition_table, if
+    it has any. Only the process that made the table should call this."""
+    unlink = getattr(table, 'unlink', None)
+    if unlink is not None:
+        table.close()
+        unlink()
@@ -35,6 +35,20 @@ def load_from_pickle(filename):
     return data
 
 
+def load_transposition_table_from_pickle(filename):
+    """Loads a pickled transposition table, raising FileNotFoundError if absent.
+
+    Tables saved before entries were tuples only held bare evaluations, so
+    those are dropped rather than mistaken for entries.
+    """
+    with open(filename, 'rb') as file:
+        table = pickle.load(file)
+    if isinstance(table, dict):
+        return {key: entry for key, entry in table.items()
+                if isinstance(entry, tuple)}
+    return table
+
+
 def load_transposition_table_from_json(filename):
     try:
         with open(filename, 'r') as file:
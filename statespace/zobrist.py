@@ -0,0 +1,173 @@
+"""Zobrist keys shared by every board representation of the statespace engine."""
+from .movecodes import decode_move
+
+# A dictionary of unique 64-bit integer hashes representing each position paired with each color marble.
+hashed_positions = {
+    (11, 0): 13694894272781220920,
+    (11, 1): 14607039107576160046,
+    (12, 0): 12693709892929482551,
+    (12, 1): 14493725204674845980,
+    (13, 0): 11463203676548433993,
+    (13, 1): 18119213271117620939,
+    (14, 0): 12359495938082685099,
+    (14, 1): 10412403109875354847,
+    (15, 0): 11116999094423638997,
+    (15, 1): 12150243862170747151,
+    (21, 0): 12924681918484655797,
+    (21, 1): 11460965234069326014,
+    (22, 0): 12034386495406519413,
+    (22, 1): 10780227088564826482,
+    (23, 0): 11938960601893694590,
+    (23, 1): 14559619112162024852,
+    (24, 0): 12232685022164288258,
+    (24, 1): 9875891702377579582,
+    (25, 0): 14654392472509107081,
+    (25, 1): 13358677899696600539,
+    (26, 0): 12153802851024297893,
+    (26, 1): 10062673996909594318,
+    (31, 0): 17521372971143704899,
+    (31, 1): 12565724512120934967,
+    (32, 0): 11821228883889561801,
+    (32, 1): 10218092236808665008,
+    (33, 0): 17755735723983079772,
+    (33, 1): 16253821213361971047,
+    (34, 0): 16479631650207109549,
+    (34, 1): 16386544523088318590,
+    (35, 0): 18046362236802915088,
+    (35, 1): 17388189481887055607,
+    (36, 0): 12671202431223526318,
+    (36, 1): 11659524893831386992,
+    (37, 0): 14130363149572028113,
+    (37, 1): 13085015433835658608,
+    (41, 0): 9609044535182176963,
+    (41, 1): 14997787664625683825,
+    (42, 0): 10525711761213278941,
+    (42, 1): 14356888956056927290,
+    (43, 0): 11803411845767890849,
+    (43, 1): 10506452118256834726,
+    (44, 0): 15381994817000786653,
+    (44, 1): 16481497618897519253,
+    (45, 0): 15975865661950339105,
+    (45, 1): 12630409121559008957,
+    (46, 0): 18086399558477619936,
+    (46, 1): 16889673582640689356,
+    (47, 0): 14570407359895287152,
+    (47, 1): 10697825034959218660,
+    (48, 0): 16634895313163162297,
+    (48, 1): 16688963933093932103,
+    (51, 0): 17930831120325885116,
+    (51, 1): 16375987739413826343,
+    (52, 0): 12272734712569918672,
+    (52, 1): 14657744075201167989,
+    (53, 0): 17811549194283030582,
+    (53, 1): 12694297780214549867,
+    (54, 0): 18039369183295143761,
+    (54, 1): 16554795969378939497,
+    (55, 0): 17750751474568372118,
+    (55, 1): 9558513512501281427,
+    (56, 0): 14669047322159990786,
+    (56, 1): 15499610380008052736,
+    (57, 0): 16227950822117312602,
+    (57, 1): 9579918655293445651,
+    (58, 0): 13481733623910160457,
+    (58, 1): 13565261466864723296,
+    (59, 0): 9791893759840836333,
+    (59, 1): 17679845650462314898,
+    (62, 0): 13597273410557151150,
+    (62, 1): 17124689689321909696,
+    (63, 0): 11871795971716157665,
+    (63, 1): 10948423374857701664,
+    (64, 0): 17653915202736172726,
+    (64, 1): 14755599962027521720,
+    (65, 0): 13534909953928563610,
+    (65, 1): 14645545458582298826,
+    (66, 0): 16457188899270023974,
+    (66, 1): 17085927068508068243,
+    (67, 0): 17995808181362736213,
+    (67, 1): 12829123630851451409,
+    (68, 0): 9472541027303409184,
+    (68, 1): 10311951967998793383,
+    (69, 0): 9933732719256774259,
+    (69, 1): 9945103606825254368,
+    (73, 0): 14904677903008461176,
+    (73, 1): 18373506872902009240,
+    (74, 0): 13357699899619609047,
+    (74, 1): 10391849480190001304,
+    (75, 0): 12548168994326596983,
+    (75, 1): 10966963903587073077,
+    (76, 0): 11110414072760217765,
+    (76, 1): 12239628134674514448,
+    (77, 0): 14375377289524518524,
+    (77, 1): 11120810800425461820,
+    (78, 0): 10804273848964161440,
+    (78, 1): 16867361814729927085,
+    (79, 0): 16702681525347858181,
+    (79, 1): 12167884145219344782,
+    (84, 0): 15933121772490062877,
+    (84, 1): 9780219023090179513,
+    (85, 0): 16104918890775603883,
+    (85, 1): 12566099435282393223,
+    (86, 0): 16489877483690276183,
+    (86, 1): 18124582226366132624,
+    (87, 0): 15899646159992549596,
+    (87, 1): 9824628651409526889,
+    (88, 0): 17513049418760900999,
+    (88, 1): 12045723817283264809,
+    (89, 0): 15979904495216373935,
+    (89, 1): 13434488723735840853,
+    (95, 0): 13055796027323318259,
+    (95, 1): 15903220087263454271,
+    (96, 0): 13062438335302049215,
+    (96, 1): 10739631755291793903,
+    (97, 0): 14099345540809372355,
+    (97, 1): 17284072150546910608,
+    (98, 0): 12935508047823904349,
+    (98, 1): 10049904970226576526,
+    (99, 0): 12041852297255749268,
+    (99, 1): 17104206928422623240
+}
+
+# XORed into the hash of every position where white (1) is to move. Made the
+# same way as the keys above, from hash_marble_position's sha256 scheme.
+SIDE_TO_MOVE_KEY = 10409870478559727738
+
+
+def zobrist_hash(board: dict[int, int], player: int) -> int:
+    """Full Zobrist hash of a board dictionary with player to move.
+
+    Only needed once per search. Below the root, hashes are carried with the
+    board and updated by XORing on zobrist_move_delta of each move made.
+    """
+    hashed_board = SIDE_TO_MOVE_KEY if player == 1 else 0
+    for marble in board.items():
+        hashed_board ^= hashed_positions[marble]
+    return hashed_board
+
+
+def zobrist_move_delta(groupmove: tuple[tuple[tuple[int, int], ...], int]) \
+        -> int:
+    """Value to XOR onto a position's hash to get the hash after groupmove.
+
+    Every marble in the group is XORed out of its coord and into its
+    destination, or just out if it is pushed off. The side to move always
+    flips. XORing the same value again undoes the move.
+    """
+    direction = groupmove[1]
+    move_hash = SIDE_TO_MOVE_KEY
+    for coord, color in groupmove[0]:
+        move_hash ^= hashed_positions[(coord, color)]
+        move_hash ^= hashed_positions.get((coord + direction, color), 0)
+    return move_hash
+
+
+# encoded move -> zobrist_move_delta of its groupmove, filled in as needed
+_encoded_move_deltas = {}
+
+
+def zobrist_encoded_move_delta(move: int) -> int:
+    """zobrist_move_delta of an encoded move, cached per move."""
+    move_hash = _encoded_move_deltas.get(move)
+    if move_hash is None:
+        move_hash = zobrist_move_delta(decode_move(move))
+        _encoded_move_deltas[move] = move_hash
+    return move_hash
@@ -0,0 +1,38 @@
+"""Cancelling a search must leave the board it searched in place untouched.
+
+usage: python -m pytest tests
+"""
+import pytest
+
+from heuristics import cam_heuristic
+from search_best_move import starting_boards
+from statespace.search import STOP_CHECK_INTERVAL, SearchContext, num_player_marbles, run_search
+
+SEARCH_OPTIONS = [{}, {'pvs': True}, {'quiescence': True}, {'pvs': True, 'null_move': True, 'lmr': True}]
+
+
+def stop_after(num_checks):
+    """A should_stop hook that cancels the search at its num_checks-th check."""
+    checks = [0]
+
+    def should_stop():
+        checks[0] += 1
+        return checks[0] >= num_checks
+    return should_stop
+
+
+@pytest.mark.parametrize('name', starting_boards)
+@pytest.mark.parametrize('search_options', SEARCH_OPTIONS)
+@pytest.mark.parametrize('num_checks', [1, 5])
+def test_cancelled_search_unmakes_its_moves(name, search_options, num_checks):
+    board = starting_boards[name]
+    ply_board = board.copy()
+    search = SearchContext(board, 0, 1.0, cam_heuristic.eval_state, {}, 4, should_stop=stop_after(num_checks),
+                           **search_options)
+
+    result = run_search(search, ply_board, float('-inf'), float('inf'), 4, 0, 80)
+
+    assert result == (None, None, None)
+    assert search.nodes >= num_checks * STOP_CHECK_INTERVAL
+    assert ply_board == board
+    assert search.marble_counts == [num_player_marbles(0, board), num_player_marbles(1, board)]